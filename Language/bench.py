@@ -0,0 +1,194 @@
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+
+import language
+
+#Usage: python bench.py [group ...]
+#Runs the programs behind the speed and memory figures quoted in the commit history. For the "before"
+#figures, run the same command with this file copied next to the language.py of the parent commit. Run
+#the memory group on its own, since peak RSS covers the whole process.
+
+def quiet(function,*args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+def best_of(repeat,function,*args):
+    best=None
+    for _ in range(repeat):
+        start=time.perf_counter()
+        quiet(function,*args)
+        elapsed=time.perf_counter()-start
+        if best is None or elapsed<best:
+            best=elapsed
+    return best
+
+def fresh_run(filename,text,engine="interpreter"):
+    language.parsed_programs.clear()
+    language.transpiled_programs.clear()
+    result,error=language.run(filename,text,engine)
+    if error:
+        raise Exception(error.show_error())
+    return result
+
+def object_size(value):
+    size=sys.getsizeof(value)
+    if hasattr(value,"__dict__"):
+        size+=sys.getsizeof(value.__dict__)
+    return size
+
+#Memory
+LARGE_PROGRAM='''take total = 0
+take total = total + 7 * 2 // 3
+Method f(a,b) {whether a<=b {"small" ifnot {"big"}}}
+Print(f(1,2))
+'''*5000
+
+LIST_PROGRAM='''take l=[]
+StartCycle i=1:200000 {
+Append(l,[i,i*2,"s"])
+}
+Is_list(l)
+'''
+
+def bench_memory():
+    source=language.Source("<bench>","take x = 1 + 2")
+    tok=language.Token(language.T_INT,1,source,0,1)
+    node=language.NumberNode(tok)
+    objects=[
+        ("Token",tok),
+        ("Position",language.Position(0,source)),
+        ("NumberNode",node),
+        ("BinaryOpnode",language.BinaryOpnode(node,tok,node)),
+        ("Number",language.Number(1000)),
+        ("List",language.List([])),
+        ("Context",language.Context("<bench>")),
+        ("SymbolTable",language.SymbolTable()),
+        ("RunTimeResult",language.RunTimeResult()),
+    ]
+    for name,value in objects:
+        print(f"{name:16}{object_size(value):6} bytes")
+
+    language.parsed_programs.clear()
+    tracemalloc.start()
+    language.generate_ast("<large>",LARGE_PROGRAM)
+    ast_size=tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"AST of a {LARGE_PROGRAM.count(chr(10))}-line script {ast_size/1e6:.1f} MB")
+
+    quiet(language.run,"<large>",LARGE_PROGRAM)
+    fresh_run("<list>",LIST_PROGRAM)
+    try:
+        import resource
+    except ImportError:
+        return
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024:.0f} MB")
+
+#Strings
+STRING_PROGRAM='''take s="start"
+StartCycle i=1:%d {
+take s=s+"abcdefghij"
+}
+s?1
+'''
+
+def bench_strings():
+    for engine in ("vm","interpreter"):
+        for steps in (10000,40000,160000):
+            start=time.perf_counter()
+            fresh_run("<strings>",STRING_PROGRAM%steps,engine)
+            print(f"{engine:12} n={steps:<7}{time.perf_counter()-start:.3f} s")
+
+#Calls
+CALL_PROGRAMS={
+    "fib(22)":'''Method fib(n) {whether n<2 {n ifnot {fib(n-1)+fib(n-2)}}}
+fib(22)
+''',
+    "100000 calls":'''Method f(x) {x+1}
+take s=0
+StartCycle i=1:100000 {
+take s=f(s)
+}
+s
+''',
+}
+DEEP_PROGRAM='''Method d(n) {whether n==0 {0 ifnot {d(n-1)+1}}}
+d(50000)
+'''
+
+def bench_calls():
+    for name,text in CALL_PROGRAMS.items():
+        for engine in ("interpreter","vm","closure","python"):
+            print(f"{name:14}{engine:12}{best_of(5,fresh_run,'<calls>',text,engine):.3f} s")
+    for engine in ("interpreter","vm","closure","python"):
+        try:
+            result,error=language.run("<deep>",DEEP_PROGRAM,engine)
+            outcome=error.details if error else result.elements[-1]
+        except RecursionError:
+            outcome="RecursionError"
+        print(f"d(50000)      {engine:12}{outcome}")
+
+#Quickening
+QUICKENING_PROGRAMS={
+    "int_arith":'''take t=0
+StartCycle i=1:200000 {
+take t=t+i*3-1
+}
+t
+''',
+    "float_arith":'''take t=0.5
+StartCycle i=1:200000 {
+take t=t*0.999+i/7
+}
+t
+''',
+    "mixed_arith":'''take t=0
+take h=0.5
+StartCycle i=1:200000 {
+whether i%2==0 {take h=i//2 ifnot {take h=i/2}}
+take t=t+h*3-1
+}
+t
+''',
+    "compare":'''take c=0
+StartCycle i=1:200000 {
+whether i%3==0 {take c=c+1}
+}
+c
+''',
+    "string_concat":'''take s=""
+StartCycle i=1:100000 {
+take s=s+"ab"
+}
+0
+''',
+    "string_index":'''take s="abcdefghij"
+take c=""
+StartCycle i=1:200000 {
+take c=s?(i%10+1)
+}
+c
+''',
+    "fib(20)":'''Method fib(n) {whether n<2 {n ifnot {fib(n-1)+fib(n-2)}}}
+fib(20)
+''',
+}
+
+def bench_quickening():
+    for name,text in QUICKENING_PROGRAMS.items():
+        print(f"{name:14}{best_of(5,fresh_run,'<quickening>',text):.3f} s")
+
+BENCHMARKS={
+    "memory":bench_memory,
+    "strings":bench_strings,
+    "calls":bench_calls,
+    "quickening":bench_quickening,
+}
+
+if __name__=="__main__":
+    groups=sys.argv[1:] or list(BENCHMARKS)
+    for group in groups:
+        print(f"#{group}")
+        BENCHMARKS[group]()
@@ -1,4 +1,17 @@
+import gc
+import hashlib
+import marshal
+import math
+import mmap
+import operator
+import os
+import re
 import string
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
 
 #Constants
 DIGITS="0123456789"
@@ -41,36 +54,64 @@ class RunTimeError(Error):
         return error
 
     def generate_traceback(self):
-        error=""
+        lines=[]
         pos=self.start
         ctx=self.context
 
         while ctx:
-            error+=f' File{pos.filename},line{str(pos.line+1)},in{ctx.display_name}\n'+error
+            lines.append(f' File{pos.filename},line{str(pos.line+1)},in{ctx.display_name}\n')
             pos=ctx.parent_pos
             ctx=ctx.parent
         
-        return 'Traceback (most recent call last):\n'+error
+        return 'Traceback (most recent call last):\n'+"".join(reversed(lines))
+
+#Source Class
+def find_line_starts(text,newline):
+    return array("q",[0]+[match.end() for match in re.finditer(newline,text)])
+
+class Source:
+    def __init__(self,filename,text):
+        self.filename=filename
+        self.line_starts=None
+        if isinstance(text,str):
+            self.text=text
+        else:
+            #Binary text is usually a file mapping, so only its line starts outlive the lexer
+            self.text=None
+            self.line_starts=find_line_starts(text,b"\n")
+
+    def line_col(self,index):
+        if self.line_starts is None:
+            self.line_starts=find_line_starts(self.text,"\n")
+        line=bisect_right(self.line_starts,index)-1
+        return line,index-self.line_starts[line]
 
 #Position Class
 class Position:
-    def __init__(self,index,line,col,filename,filetext):
+    __slots__=("index","source")
+
+    def __init__(self,index,source):
         self.index=index
-        self.line=line
-        self.col=col
-        self.filename=filename
-        self.filetext=filetext
-
-    def advance(self,current_char=None):
-        self.index+=1
-        self.col+=1
-        if current_char=="\n":
-            self.line+=1
-            self.col=0
-        return self
+        self.source=source
+
+    @property
+    def line(self):
+        return self.source.line_col(self.index)[0]
+
+    @property
+    def col(self):
+        return self.source.line_col(self.index)[1]
+
+    @property
+    def filename(self):
+        return self.source.filename
+
+    @property
+    def filetext(self):
+        return self.source.text
 
     def copy(self):
-        return Position(self.index,self.line,self.col,self.filename,self.filetext)
+        return Position(self.index,self.source)
 
 #Tokens and Keywords
 T_INT="INT"
@@ -108,17 +149,22 @@ KEYWORD=["take","and","or","not","whether","further","ifnot","StartCycle","to","
 
 #Token Class
 class Token:
-    def __init__(self,type_,value=None,start=None,end=None):
+    __slots__=("type","value","source","start_index","end_index")
+
+    def __init__(self,type_,value,source,start_index,end_index):
         self.type=type_
         self.value=value
-        
-        if start:
-            self.start=start.copy()
-            self.end=start.copy()
-            self.end.advance()
+        self.source=source
+        self.start_index=start_index
+        self.end_index=end_index
+
+    @property
+    def start(self):
+        return Position(self.start_index,self.source)
 
-        if end:
-            self.end=end.copy()
+    @property
+    def end(self):
+        return Position(self.end_index,self.source)
 
     def matches(self,type_,value):
         return self.type==type_ and self.value==value
@@ -128,216 +174,186 @@ class Token:
             return f'{self.type}:{self.value}'
         return f'{self.type}'
 
+#Token List Class
+TOKEN_TYPES=(
+    T_INT,T_FLOAT,T_STRING,T_IDENTIFIER,T_KEYWORD,T_EQUAL,T_PLUS,T_MINUS,T_MULTIPLY,T_DIVIDE,
+    T_FLOORDIVIDE,T_MODULO,T_POWER,T_LPAREN,T_RPAREN,T_LPAREN2,T_RPAREN2,T_LPAREN3,T_RPAREN3,
+    T_NEWLINE,T_COLON,T_EE,T_NE,T_LT,T_LTE,T_GT,T_GTE,T_COMMA,T_INDEX,T_EOF,
+)
+TOKEN_CODES={type_:code for code,type_ in enumerate(TOKEN_TYPES)}
+
+class TokenList:
+    def __init__(self,source):
+        self.source=source
+        self.types=array("B")
+        self.values=[]
+        self.starts=array("q")
+        self.ends=array("q")
+
+    def append(self,type_,value,start,end):
+        self.types.append(TOKEN_CODES[type_])
+        self.values.append(value)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self,index):
+        return Token(TOKEN_TYPES[self.types[index]],self.values[index],self.source,self.starts[index],self.ends[index])
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
+
+    def __repr__(self):
+        return repr(list(self))
+
+#Lexer Tables
+TOKEN_PATTERN=re.compile(r'''
+    (?P<SKIP>[ \t]+)
+    |(?P<NEWLINE>[;\n])
+    |(?P<NUMBER>[0-9]+(?:\.[0-9]*)?)
+    |(?P<IDENTIFIER>[A-Za-z][A-Za-z0-9_]*)
+    |(?P<STRING>"[^"]*"?)
+    |(?P<OPERATOR>//|==|!=|<=|>=|[-+*/%?:^(){}\[\],=<>])
+''',re.VERBOSE)
+
+OPERATOR_TOKENS={
+    "+":T_PLUS,"-":T_MINUS,"*":T_MULTIPLY,"/":T_DIVIDE,"//":T_FLOORDIVIDE,
+    "%":T_MODULO,"?":T_INDEX,":":T_COLON,"^":T_POWER,
+    "(":T_LPAREN,")":T_RPAREN,"{":T_LPAREN2,"}":T_RPAREN2,"[":T_LPAREN3,"]":T_RPAREN3,
+    ",":T_COMMA,"=":T_EQUAL,"==":T_EE,"!=":T_NE,"<":T_LT,"<=":T_LTE,">":T_GT,">=":T_GTE,
+}
+BINARY_TOKEN_PATTERN=re.compile(TOKEN_PATTERN.pattern.encode(),re.VERBOSE)
+
+KEYWORDS=frozenset(KEYWORD)
+
 #Lexer Class
 class Lexer:
     def __init__(self,filename,text):
-        self.filename=filename
         self.text=text
-        self.pos=Position(-1,0,-1,filename,text)
-        self.current_char=None
-        self.advance()
-
-    def advance(self):
-        self.pos.advance(self.current_char)
-        if self.pos.index<len(self.text):
-            self.current_char=self.text[self.pos.index]
-        else:
-            self.current_char=None
-
-    def make_number(self):
-        num=""
-        dot_count=0
-        start=self.pos.copy()
-
-        while self.current_char !=None and self.current_char in DIGITS+".":
-            if self.current_char==".":
-                if dot_count==1:
-                    break
-                dot_count+=1
-                num+="."
-            else:
-                num+=self.current_char
-            self.advance()
+        self.source=Source(filename,text)
+        self.error=None
 
-        if dot_count==0:
-            return Token(T_INT,int(num),start,self.pos)
-        else:
-            return Token(T_FLOAT,float(num),start,self.pos)
+    def create_tokens(self):
+        tokens=TokenList(self.source)
+        append=tokens.append
 
-    def make_string(self):
-        string=""
-        start=self.pos.copy()
-        escape_character=False
-        self.advance()
+        for token in self.generate_tokens():
+            append(token.type,token.value,token.start_index,token.end_index)
 
-        escape_characters={"n":"\n","t":"\t",}
+        if self.error:
+            return [],self.error
+        return tokens,None
 
-        while self.current_char!=None and (self.current_char!='"' or escape_character):
-            if escape_character:
-                string+=escape_characters.get(self.current_char,self.current_char)
-            else:
-                if self.current_char=="\\":
-                    escape_character=True
+    def generate_tokens(self):
+        source=self.source
+        text=self.text
+        binary=not isinstance(text,str)
+        match=(BINARY_TOKEN_PATTERN if binary else TOKEN_PATTERN).match
+        index=0
+        length=len(text)
+
+        while index<length:
+            m=match(text,index)
+            if m is None:
+                start=Position(index,source)
+                char=text[index:index+1]
+                if binary:
+                    char=char.decode("utf-8","replace")
+                if char=="!":
+                    self.error=ExpectedCharError(start,Position(index+2,source),"'=' after '!'")
                 else:
-                    string+=self.current_char
-            self.advance()
-            escape_character=False
-
-        self.advance()
-        return Token(T_STRING,string,start,self.pos)
-
-    def make_identifier(self):
-        id_string=""
-        start=self.pos.copy()
-
-        while self.current_char!=None and self.current_char in LETTERS_DIGITS+"_":
-            id_string+=self.current_char
-            self.advance()
-
-        if id_string in KEYWORD:
-            tok_type=T_KEYWORD
-        else:
-            tok_type=T_IDENTIFIER
-
-        return Token(tok_type,id_string,start,self.pos)
-
-    def make_divide(self):
-        tok_type=T_DIVIDE
-        start=self.pos.copy()
-        self.advance()
-
-        if self.current_char=="/":
-            self.advance()
-            tok_type=T_FLOORDIVIDE
-        
-        return Token(tok_type,start=start,end=self.pos)
-
-    def make_not_equals(self):
-        start=self.pos.copy()
-        self.advance()
-
-        if self.current_char=="=":
-            self.advance()
-            return Token(T_NE,start=start,end=self.pos)
-        
-        self.advance()
-        return None,ExpectedCharError(start,self.pos,"'=' after '!'")
-
-    def make_equals(self):
-        tok_type=T_EQUAL
-        start=self.pos.copy()
-        self.advance()
-
-        if self.current_char=="=":
-            self.advance()
-            tok_type=T_EE
-        
-        return Token(tok_type,start=start,end=self.pos)
-
-    def make_less_than(self):
-        tok_type=T_LT
-        start=self.pos.copy()
-        self.advance()
-
-        if self.current_char=="=":
-            self.advance()
-            tok_type=T_LTE
-        
-        return Token(tok_type,start=start,end=self.pos)
-
-    def make_greater_than(self):
-        tok_type=T_GT
-        start=self.pos.copy()
-        self.advance()
-
-        if self.current_char=="=":
-            self.advance()
-            tok_type=T_GTE
-        
-        return Token(tok_type,start=start,end=self.pos)
+                    self.error=IllegalCharacterError(start,Position(index+1,source),"'"+char+"'")
+                return
 
-    def create_tokens(self):
-        tokens=[]
+            kind=m.lastgroup
+            end=m.end()
+            if kind=="SKIP":
+                index=end
+                continue
 
-        while self.current_char!=None:
-            if self.current_char in " \t":
-                self.advance()
-            elif self.current_char in ";\n":
-                tokens.append(Token(T_NEWLINE,start=self.pos))
-                self.advance()
-            elif self.current_char in DIGITS:
-                tokens.append(self.make_number())
-            elif self.current_char in LETTERS:
-                tokens.append(self.make_identifier())
-            elif self.current_char=='"':
-                tokens.append(self.make_string())
-            elif self.current_char=="+":
-                tokens.append(Token(T_PLUS,start=self.pos))
-                self.advance()
-            elif self.current_char=="-":
-                tokens.append(Token(T_MINUS,start=self.pos))
-                self.advance()
-            elif self.current_char=="*":
-                tokens.append(Token(T_MULTIPLY,start=self.pos))
-                self.advance()
-            elif self.current_char=="/":
-                tokens.append(self.make_divide())
-            elif self.current_char=="%":
-                tokens.append(Token(T_MODULO,start=self.pos))
-                self.advance()  
-            elif self.current_char=="?":
-                tokens.append(Token(T_INDEX,start=self.pos))
-                self.advance()
-            elif self.current_char==":":
-                tokens.append(Token(T_COLON,start=self.pos))
-                self.advance()
-            elif self.current_char=="^":
-                tokens.append(Token(T_POWER,start=self.pos))
-                self.advance()
-            elif self.current_char=="(":
-                tokens.append(Token(T_LPAREN,start=self.pos))
-                self.advance()
-            elif self.current_char==")":
-                tokens.append(Token(T_RPAREN,start=self.pos))
-                self.advance()
-            elif self.current_char=="{":
-                tokens.append(Token(T_LPAREN2,start=self.pos))
-                self.advance()
-            elif self.current_char=="}":
-                tokens.append(Token(T_RPAREN2,start=self.pos))
-                self.advance()
-            elif self.current_char=="[":
-                tokens.append(Token(T_LPAREN3,start=self.pos))
-                self.advance()
-            elif self.current_char=="]":
-                tokens.append(Token(T_RPAREN3,start=self.pos))
-                self.advance()
-            elif self.current_char==",":
-                tokens.append(Token(T_COMMA,start=self.pos))
-                self.advance()
-            elif self.current_char=="!":
-                tok,error=self.make_not_equals()
-                if error:
-                    return [],error
-                tokens.append(tok)
-            elif self.current_char=="=":
-                tokens.append(self.make_equals())
-            elif self.current_char=="<":
-                tokens.append(self.make_less_than())
-            elif self.current_char==">":
-                tokens.append(self.make_greater_than())
+            raw=m.group()
+            if binary:
+                raw=raw.decode("utf-8")
+            if kind=="IDENTIFIER":
+                yield Token(T_KEYWORD if raw in KEYWORDS else T_IDENTIFIER,raw,source,index,end)
+            elif kind=="OPERATOR":
+                yield Token(OPERATOR_TOKENS[raw],None,source,index,end)
+            elif kind=="NUMBER":
+                if "." in raw:
+                    yield Token(T_FLOAT,float(raw),source,index,end)
+                else:
+                    yield Token(T_INT,int(raw),source,index,end)
+            elif kind=="NEWLINE":
+                yield Token(T_NEWLINE,None,source,index,end)
             else:
-                start=self.pos.copy()
-                char=self.current_char
-                self.advance()
-                return [],IllegalCharacterError(start,self.pos,"'"+char+"'")
-        tokens.append(Token(T_EOF,start=self.pos))
-        return tokens,None
+                if len(raw)>1 and raw[-1]=='"':
+                    raw=raw[1:-1]
+                else:
+                    raw=raw[1:]
+                    end+=1
+                yield Token(T_STRING,raw.replace("\\",""),source,index,end)
+            index=end
+
+        yield Token(T_EOF,None,source,index,index+1)
+
+#Token Stream Class
+class TokenStream:
+    def __init__(self,lexer):
+        self.lexer=lexer
+        self.tokens=lexer.generate_tokens()
+        self.buffer=[]
+        self.offset=0
+        self.done=False
+
+    @property
+    def error(self):
+        return self.lexer.error
+
+    def fill(self):
+        if self.done:
+            return False
+        token=next(self.tokens,None)
+        if token is None:
+            self.done=True
+            if not self.lexer.error:
+                return False
+            index=self.lexer.error.start.index
+            token=Token(T_EOF,None,self.lexer.source,index,index+1)
+        self.buffer.append(token)
+        return True
+
+    def __getitem__(self,index):
+        if index<0:
+            raise IndexError(index)
+        position=index-self.offset
+        if position<0:
+            raise Exception(f"Token {index} was released from the stream")
+        buffer=self.buffer
+        while position>=len(buffer):
+            if not self.fill():
+                raise IndexError(index)
+        return buffer[position]
+
+    def release(self,index):
+        if index>self.offset:
+            del self.buffer[:index-self.offset]
+            self.offset=index
+
+    def finish(self):
+        for token in self.tokens:
+            pass
+        return self.lexer.error
 
 #Nodes Classes
 class NumberNode():
+    __slots__=("tok","constant","start","end")
+
     def __init__(self,tok):
         self.tok=tok
+        self.constant=None
         self.start=self.tok.start
         self.end=self.tok.end
     
@@ -345,8 +361,11 @@ class NumberNode():
         return f'{self.tok}'
 
 class StringNode():
+    __slots__=("tok","constant","start","end")
+
     def __init__(self,tok):
         self.tok=tok
+        self.constant=None
         self.start=self.tok.start
         self.end=self.tok.end
     
@@ -354,12 +373,17 @@ class StringNode():
         return f'{self.tok}'
 
 class ListNode():
+    __slots__=("element_nodes","discard","start","end")
+
     def __init__(self,element_nodes,start,end):
         self.element_nodes=element_nodes
+        self.discard=False
         self.start=start
         self.end=end
 
 class DictionaryNode():
+    __slots__=("key_nodes","value_nodes","start","end")
+
     def __init__(self,key_nodes,value_nodes,start,end):
         self.key_nodes=key_nodes
         self.value_nodes=value_nodes
@@ -367,24 +391,34 @@ class DictionaryNode():
         self.end=end
         
 class VarAccessNode:
+    __slots__=("var_name_tok","address","start","end")
+
     def __init__(self,var_name_tok):
         self.var_name_tok=var_name_tok
+        self.address=None
         self.start=self.var_name_tok.start
         self.end=self.var_name_tok.end
 
 class VarAssignNode:
+    __slots__=("var_name_tok","value_node","address","start","end")
+
     def __init__(self,var_name_tok,value_node):
         self.var_name_tok=var_name_tok
         self.value_node=value_node
+        self.address=None
         self.start=self.var_name_tok.start
         self.end=self.var_name_tok.end
 
 
 class BinaryOpnode:
+    __slots__=("left_node","operator","right_node","method_name","quick","start","end")
+
     def __init__(self,left_node,operator,right_node):
         self.left_node=left_node
         self.operator=operator
         self.right_node=right_node
+        self.method_name=binary_method(operator)
+        self.quick=None
         self.start=self.left_node.start
         self.end=self.right_node.end
 
@@ -392,6 +426,8 @@ class BinaryOpnode:
         return f'({self.left_node},{self.operator},{self.right_node})'
 
 class UnaryOpnode:
+    __slots__=("operator","node","start","end")
+
     def __init__(self,operator,node):
         self.operator=operator
         self.node=node
@@ -402,6 +438,8 @@ class UnaryOpnode:
         return f'({self.operator},{self.node})'
 
 class IfNode:
+    __slots__=("cases","else_case","start","end")
+
     def __init__(self,cases,else_case):
         self.cases=cases
         self.else_case=else_case
@@ -410,6 +448,8 @@ class IfNode:
         self.end=(self.else_case or self.cases[len(self.cases)-1])[0].end
 
 class ForNode:
+    __slots__=("var_name_tok","start_value_node","end_value_node","step_value_node","body_node","return_null","address","start","end")
+
     def __init__(self,var_name_tok,start_value_node,end_value_node,step_value_node,body_node,return_null):
         self.var_name_tok=var_name_tok
         self.start_value_node=start_value_node
@@ -417,11 +457,14 @@ class ForNode:
         self.step_value_node=step_value_node
         self.body_node=body_node
         self.return_null=return_null
+        self.address=None
 
         self.start=self.var_name_tok.start
         self.end=self.body_node.end
 
 class WhileNode:
+    __slots__=("condition_node","body_node","return_null","start","end")
+
     def __init__(self,condition_node,body_node,return_null):
         self.condition_node=condition_node
         self.body_node=body_node
@@ -431,11 +474,15 @@ class WhileNode:
         self.return_null=return_null
 
 class FuncDefNode:
+    __slots__=("var_name_tok","arg_name_toks","body_node","return_null","address","layout","start","end")
+
     def __init__(self,var_name_tok,arg_name_toks,body_node,return_null):
         self.var_name_tok=var_name_tok
         self.arg_name_toks=arg_name_toks
         self.body_node=body_node
         self.return_null=return_null
+        self.address=None
+        self.layout=None
 
         if self.var_name_tok:
             self.start=self.var_name_tok.start
@@ -447,6 +494,8 @@ class FuncDefNode:
         self.end=self.body_node.end
 
 class CallNode:
+    __slots__=("node_to_call","arg_nodes","start","end")
+
     def __init__(self,node_to_call,arg_nodes):
         self.node_to_call=node_to_call
         self.arg_nodes=arg_nodes
@@ -458,8 +507,29 @@ class CallNode:
         else:
             self.end=self.node_to_call.end
 
+class CachedNode:
+    __slots__=("node","slot","start","end")
+
+    def __init__(self,node,slot):
+        self.node=node
+        self.slot=slot
+        self.start=node.start
+        self.end=node.end
+
+class CacheScopeNode:
+    __slots__=("node","slots","guards","start","end")
+
+    def __init__(self,node,slots,guards):
+        self.node=node
+        self.slots=slots
+        self.guards=guards
+        self.start=node.start
+        self.end=node.end
+
 #Parse Result
 class ParseResult:
+    __slots__=("error","node","last_registered_advance_count","advance_count","to_reverse_count")
+
     def __init__(self):
         self.error=None
         self.node=None
@@ -493,6 +563,26 @@ class ParseResult:
             self.error=error
         return self
 
+#Binding Powers
+LOGICAL_BINDING=1
+COMPARISON_BINDING=2
+ARITH_BINDING=3
+TERM_BINDING=4
+POWER_BINDING=5
+
+BINDING_POWERS={
+    T_EE:COMPARISON_BINDING,T_NE:COMPARISON_BINDING,T_LT:COMPARISON_BINDING,
+    T_LTE:COMPARISON_BINDING,T_GT:COMPARISON_BINDING,T_GTE:COMPARISON_BINDING,
+    T_PLUS:ARITH_BINDING,T_MINUS:ARITH_BINDING,
+    T_MULTIPLY:TERM_BINDING,T_DIVIDE:TERM_BINDING,T_INDEX:TERM_BINDING,
+    T_FLOORDIVIDE:TERM_BINDING,T_MODULO:TERM_BINDING,
+    T_POWER:POWER_BINDING,
+}
+KEYWORD_BINDING_POWERS={"and":LOGICAL_BINDING,"or":LOGICAL_BINDING}
+
+EXPRESSION_TOKENS=frozenset((T_INT,T_FLOAT,T_STRING,T_IDENTIFIER,T_LPAREN,T_LPAREN2,T_LPAREN3,T_PLUS,T_MINUS))
+EXPRESSION_KEYWORDS=frozenset(("take","not","whether","StartCycle","AsLongAs","Method"))
+
 #Parser Class
 class Parser:
     def __init__(self,tokens):
@@ -511,16 +601,34 @@ class Parser:
         return self.current_tok
 
     def update_current_tok(self):
-        if self.token_index<len(self.tokens):
+        try:
             self.current_tok=self.tokens[self.token_index]
+        except IndexError:
+            pass
+
+    def release(self):
+        if isinstance(self.tokens,TokenStream):
+            self.tokens.release(self.token_index)
 
     def parse(self):
-        res=self.statements()
+        gc_enabled=gc.isenabled()
+        gc.disable()
+        try:
+            res=self.statements(True)
+        finally:
+            if gc_enabled:
+                gc.enable()
         if not res.error and self.current_tok.type!=T_EOF:
             return res.failure(InvalidSyntaxError(self.current_tok.start,self.current_tok.end,"Expected '+','-','*' or '/'"))
         return res
 
-    def statements(self):
+    def starts_expression(self):
+        tok=self.current_tok
+        if tok.type==T_KEYWORD:
+            return tok.value in EXPRESSION_KEYWORDS
+        return tok.type in EXPRESSION_TOKENS
+
+    def statements(self,top_level=False):
         res=ParseResult()
         statements=[]
         start=self.current_tok.start.copy()
@@ -534,25 +642,22 @@ class Parser:
             return res
         statements.append(statement)
 
-        more_statements=True
-
         while True:
             newline_count=0
             while self.current_tok.type==T_NEWLINE:
                 res.register_advancement()
                 self.advance()
                 newline_count+=1
-            if newline_count==0:
-                more_statements=False
 
-            if not more_statements:
+            if newline_count==0 or not self.starts_expression():
                 break
+            if top_level:
+                self.release()
             statement=res.try_register(self.expression())
 
             if not statement:
                 self.reverse(res.to_reverse_count)
-                more_statements=False
-                continue
+                break
             statements.append(statement)
         
         return res.success(ListNode(statements,start,self.current_tok.end.copy()))
@@ -560,7 +665,7 @@ class Parser:
     def list_expression(self):
         res=ParseResult()
         element_nodes=[]
-        start=self.current_tok.start.copy
+        start=self.current_tok.start.copy()
 
         if self.current_tok.type!=T_LPAREN3:
             return res.failure(InvalidSyntaxError(self.current_tok.start,self.current_tok.end,f"Expected '['"))
@@ -596,7 +701,7 @@ class Parser:
         res=ParseResult()
         key_nodes=[]
         value_nodes=[]
-        start=self.current_tok.start.copy
+        start=self.current_tok.start.copy()
 
         if self.current_tok.type!=T_LPAREN2:
             return res.failure(InvalidSyntaxError(self.current_tok.start,self.current_tok.end,"Expected '{'"))
@@ -1005,9 +1110,6 @@ class Parser:
 
         return res.failure(InvalidSyntaxError(tok.start,tok.end,"Expected int,float,identifier,'+','-' or '('"))
 
-    def power(self):
-        return self.BinaryOperation(self.call,(T_POWER,),self.factor)
-
     def factor(self):
         res=ParseResult()
         tok=self.current_tok
@@ -1015,31 +1117,31 @@ class Parser:
         if tok.type in (T_PLUS,T_MINUS):
             res.register_advancement()
             self.advance()
-            factor=res.register(self.factor())
+            factor=res.register(self.operation(POWER_BINDING))
             if res.error:
                 return res
             return res.success(UnaryOpnode(tok,factor))
 
-        return self.power()
+        return self.call()
 
-    def term(self):
-        return self.BinaryOperation(self.factor,(T_MULTIPLY,T_DIVIDE,T_INDEX,T_FLOORDIVIDE,T_MODULO))
+    def operand(self,min_power):
+        if min_power>COMPARISON_BINDING:
+            return self.factor()
 
-    def comp_expression(self):
         res=ParseResult()
+        tok=self.current_tok
 
-        if self.current_tok.matches(T_KEYWORD,"not"):
-            operator=self.current_tok
+        if tok.matches(T_KEYWORD,"not"):
             res.register_advancement()
             self.advance()
 
-            node=res.register(self.comp_expression())
+            node=res.register(self.operation(COMPARISON_BINDING))
             if res.error:
                 return res
-            
-            return res.success(UnaryOpnode(operator,node))
 
-        node=res.register(self.BinaryOperation(self.arith_expression,(T_EE,T_NE,T_LT,T_LTE,T_GT,T_GTE)))
+            return res.success(UnaryOpnode(tok,node))
+
+        node=res.register(self.factor())
 
         if res.error:
             return res.failure(InvalidSyntaxError(self.current_tok.start,self.current_tok.end,
@@ -1047,8 +1149,29 @@ class Parser:
 
         return res.success(node)
 
-    def arith_expression(self):
-        return self.BinaryOperation(self.term,(T_PLUS,T_MINUS))
+    def operation(self,min_power):
+        res=ParseResult()
+        left=res.register(self.operand(min_power))
+        if res.error:
+            return res
+
+        while True:
+            operator=self.current_tok
+            if operator.type==T_KEYWORD:
+                power=KEYWORD_BINDING_POWERS.get(operator.value)
+            else:
+                power=BINDING_POWERS.get(operator.type)
+            if power is None or power<min_power:
+                break
+
+            res.register_advancement()
+            self.advance()
+            right=res.register(self.operation(power if power==POWER_BINDING else power+1))
+            if res.error:
+                return res
+            left=BinaryOpnode(left,operator,right)
+
+        return res.success(left)
 
     def expression(self):
         res=ParseResult()
@@ -1073,7 +1196,7 @@ class Parser:
                 return res
             return res.success(VarAssignNode(var_name,expression))
             
-        node=res.register(self.BinaryOperation(self.comp_expression,((T_KEYWORD,"and"),(T_KEYWORD,"or"))))
+        node=res.register(self.operation(LOGICAL_BINDING))
 
         if res.error:
             return res.failure(InvalidSyntaxError(self.current_tok.start,self.current_tok.end,
@@ -1166,152 +1289,1080 @@ class Parser:
 
         return(res.success(FuncDefNode(var_name_tok,arg_name_toks,body,True)))
 
+#LRU Cache Class
+class LRUCache:
+    def __init__(self,maxsize=128):
+        self.maxsize=maxsize
+        self.entries=OrderedDict()
+        self.hits=0
+        self.misses=0
+
+    def get(self,key,default=None):
+        if key in self.entries:
+            self.hits+=1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses+=1
+        return default
+
+    def set(self,key,value):
+        self.entries[key]=value
+        self.entries.move_to_end(key)
+        while len(self.entries)>self.maxsize:
+            self.entries.popitem(last=False)
+
+    def resize(self,maxsize):
+        self.maxsize=maxsize
+        while len(self.entries)>self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits=0
+        self.misses=0
+
+    def __contains__(self,key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+def source_key(filename,text):
+    if isinstance(text,str):
+        text=text.encode("utf-8")
+    return filename,hashlib.sha256(text).hexdigest()
+
+#Parsed programs are shared by every later run of the same source on every engine, so the engines treat
+#AST nodes as read-only. The only runtime writes are caches that do not depend on the run: NumberNode and
+#StringNode keep their constant value, and a BinaryOpnode keeps the fast path it was quickened to. A fast
+#path checks its operand types on every use and falls back to the generic path for good on a mismatch, so
+#type feedback from one run can change how fast another run is but never what it computes.
+parsed_programs=LRUCache(256)
+
+def prepare_ast(node):
+    node=Resolver(global_symbol_table).resolve(node)
+    node=ResultUsage().mark(node)
+    return ExpressionCacher().optimize(node)
+
+def generate_ast(filename,text,key=None,artifact=None):
+    if key is None:
+        key=source_key(filename,text)
+    ast=parsed_programs.get(key)
+    if ast:
+        if artifact and ast[0] and not artifact_current(artifact,key):
+            save_artifact(artifact,key,ast[0])
+        return ast
+
+    if artifact:
+        node=load_artifact(artifact,filename,text,key)
+        if node:
+            ast=prepare_ast(node),None
+            parsed_programs.set(key,ast)
+            return ast
 
-    def BinaryOperation(self,function1,operators,function2=None):
-        if function2==None:
-            function2=function1
-        res=ParseResult()
-        left=res.register(function1())
-        if res.error:
-            return res
+    #Generate Tokens
+    lexer=Lexer(filename,text)
+    tokens=TokenStream(lexer)
 
-        while self.current_tok.type in operators or (self.current_tok.type,self.current_tok.value) in operators:
-            operator=self.current_tok
-            res.register_advancement()
-            self.advance()
-            right=res.register(function2())
-            if res.error:
-                return res
-            left=BinaryOpnode(left,operator,right)
+    #Generate Abstract Syntax Tree
+    parser=Parser(tokens)
+    result=parser.parse()
 
-        return res.success(left)
+    error=tokens.finish()
+    if error:
+        ast=None,error
+    elif result.error:
+        ast=None,result.error
+    else:
+        node=ConstantFolder().visit(result.node)
+        if artifact:
+            save_artifact(artifact,key,node)
+        ast=prepare_ast(node),None
+
+    parsed_programs.set(key,ast)
+    return ast
+
+#Program Artifacts
+ARTIFACT_MAGIC=b"CLPA"
+ARTIFACT_VERSION=1
+
+class ArtifactWriter:
+    def encode(self,node):
+        if node is None:
+            return None
+        method=getattr(self,f'encode_{type(node).__name__}')
+        return method(node)
 
+    def encode_token(self,tok):
+        if tok is None:
+            return None
+        return (TOKEN_CODES[tok.type],tok.value,tok.start_index,tok.end_index)
 
-#RunTimeResult Class
-class RunTimeResult:
-    def __init__(self):
-        self.value=None
-        self.error=None
-    
-    def register(self,res):
-        if res.error:
-            self.error=res.error
-        return res.value
-    
-    def success(self,value):
-        self.value=value
-        return self
+    def encode_NumberNode(self,node):
+        return ("NumberNode",self.encode_token(node.tok))
 
-    def failure(self,error):
-        self.error=error
-        return self
+    def encode_StringNode(self,node):
+        return ("StringNode",self.encode_token(node.tok))
 
-#Value Class
-class Value:
-    def __init__(self):
-        self.set_pos()
-        self.set_context()
-    
-    def set_pos(self,start=None,end=None):
-        self.start=start
-        self.end=end
-        return self
+    def encode_ListNode(self,node):
+        return ("ListNode",tuple(self.encode(element) for element in node.element_nodes),node.start.index,node.end.index)
 
-    def set_context(self,context=None):
-        self.context=context
-        return self
+    def encode_DictionaryNode(self,node):
+        return ("DictionaryNode",tuple(self.encode(key) for key in node.key_nodes),
+        tuple(self.encode(value) for value in node.value_nodes),node.start.index,node.end.index)
 
-    def add(self,other):
-        return None,self.illegal_operation(other)
-    
-    def subtract(self,other):
-        return None,self.illegal_operation(other)
+    def encode_VarAccessNode(self,node):
+        return ("VarAccessNode",self.encode_token(node.var_name_tok))
 
-    def multiply(self,other):
-        return None,self.illegal_operation(other)
+    def encode_VarAssignNode(self,node):
+        return ("VarAssignNode",self.encode_token(node.var_name_tok),self.encode(node.value_node))
 
-    def divide(self,other):
-        return None,self.illegal_operation(other)
-    
-    def floor_divide(self,other):
-        return None,self.illegal_operation(other)
+    def encode_BinaryOpnode(self,node):
+        return ("BinaryOpnode",self.encode(node.left_node),self.encode_token(node.operator),self.encode(node.right_node))
 
-    def modulo(self,other):
-        return None,self.illegal_operation(other)
+    def encode_UnaryOpnode(self,node):
+        return ("UnaryOpnode",self.encode_token(node.operator),self.encode(node.node))
 
-    def power(self,other):
-        return None,self.illegal_operation(other)
+    def encode_IfNode(self,node):
+        cases=tuple((self.encode(condition),self.encode(body),return_null) for condition,body,return_null in node.cases)
+        else_case=None
+        if node.else_case:
+            else_case=(self.encode(node.else_case[0]),node.else_case[1])
+        return ("IfNode",cases,else_case)
 
-    def comparison_equal(self,other):
-        return None,self.illegal_operation(other)
+    def encode_ForNode(self,node):
+        return ("ForNode",self.encode_token(node.var_name_tok),self.encode(node.start_value_node),self.encode(node.end_value_node),
+        self.encode(node.step_value_node),self.encode(node.body_node),node.return_null)
 
-    def comparison_notequal(self,other):
-        return None,self.illegal_operation(other)
+    def encode_WhileNode(self,node):
+        return ("WhileNode",self.encode(node.condition_node),self.encode(node.body_node),node.return_null)
 
-    def comparison_lessthanequal(self,other):
-        return None,self.illegal_operation(other)
+    def encode_FuncDefNode(self,node):
+        return ("FuncDefNode",self.encode_token(node.var_name_tok),tuple(self.encode_token(tok) for tok in node.arg_name_toks),
+        self.encode(node.body_node),node.return_null)
 
-    def comparison_greaterthanequal(self,other):
-        return None,self.illegal_operation(other)
+    def encode_CallNode(self,node):
+        return ("CallNode",self.encode(node.node_to_call),tuple(self.encode(arg) for arg in node.arg_nodes))
 
-    def comparison_greaterthan(self,other):
-        return None,self.illegal_operation(other)
+    #Cached ASTs are already prepared, and preparing the loaded tree adds the caching nodes back
+    def encode_CachedNode(self,node):
+        return self.encode(node.node)
 
-    def comparison_lessthan(self,other):
-        return None,self.illegal_operation(other)
+    def encode_CacheScopeNode(self,node):
+        return self.encode(node.node)
 
-    def andop(self,other):
-        return None,self.illegal_operation(other)
+class ArtifactReader:
+    def __init__(self,source):
+        self.source=source
 
-    def orop(self,other):
-        return None,self.illegal_operation(other)
+    def decode(self,data):
+        if data is None:
+            return None
+        method=getattr(self,f'decode_{data[0]}')
+        return method(*data[1:])
 
-    def notop(self):
-        return None,self.illegal_operation()
+    def decode_token(self,data):
+        if data is None:
+            return None
+        type_code,value,start_index,end_index=data
+        return Token(TOKEN_TYPES[type_code],value,self.source,start_index,end_index)
 
-    def execute(self,args):
-        return RunTimeResult().failure(self.illegal_operation())
+    def decode_NumberNode(self,tok):
+        return NumberNode(self.decode_token(tok))
 
-    def copy(self):
-        raise Exception("No Copy Method Defined")
+    def decode_StringNode(self,tok):
+        return StringNode(self.decode_token(tok))
 
-    def is_true(self):
-        return False
+    def decode_ListNode(self,element_nodes,start,end):
+        return ListNode([self.decode(element) for element in element_nodes],Position(start,self.source),Position(end,self.source))
 
-    def illegal_operation(self,other=None):
-        if not other:
-            other=self
-        return RunTimeError(self.start,other.end,"Illegal Operation",self.context)
+    def decode_DictionaryNode(self,key_nodes,value_nodes,start,end):
+        return DictionaryNode([self.decode(key) for key in key_nodes],[self.decode(value) for value in value_nodes],
+        Position(start,self.source),Position(end,self.source))
 
-#Number Class
-class Number(Value):
-    def __init__(self,value):
-        super().__init__()
-        self.value=value
+    def decode_VarAccessNode(self,var_name_tok):
+        return VarAccessNode(self.decode_token(var_name_tok))
 
-    def add(self,other):
-        if isinstance(other,Number):
-            return Number(self.value+other.value).set_context(self.context),None
-        else:
-            return None,Value.illegal_operation(self,other)
+    def decode_VarAssignNode(self,var_name_tok,value_node):
+        return VarAssignNode(self.decode_token(var_name_tok),self.decode(value_node))
 
-    def subtract(self,other):
-        if isinstance(other,Number):
-            return Number(self.value-other.value).set_context(self.context),None
-        else:
-            return None,Value.illegal_operation(self,other)
+    def decode_BinaryOpnode(self,left_node,operator,right_node):
+        return BinaryOpnode(self.decode(left_node),self.decode_token(operator),self.decode(right_node))
 
-    def multiply(self,other):
-        if isinstance(other,Number):
-            return Number(self.value*other.value).set_context(self.context),None
-        else:
-            return None,Value.illegal_operation(self,other)
+    def decode_UnaryOpnode(self,operator,node):
+        return UnaryOpnode(self.decode_token(operator),self.decode(node))
 
-    def divide(self,other):
-        if isinstance(other,Number):
-            if other.value==0:
-                return None,RunTimeError(other.start,other.end,"Division By Zero",self.context)
-            return Number(self.value/other.value).set_context(self.context),None
+    def decode_IfNode(self,cases,else_case):
+        cases=[(self.decode(condition),self.decode(body),return_null) for condition,body,return_null in cases]
+        if else_case:
+            else_case=(self.decode(else_case[0]),else_case[1])
+        return IfNode(cases,else_case)
+
+    def decode_ForNode(self,var_name_tok,start_value_node,end_value_node,step_value_node,body_node,return_null):
+        return ForNode(self.decode_token(var_name_tok),self.decode(start_value_node),self.decode(end_value_node),
+        self.decode(step_value_node),self.decode(body_node),return_null)
+
+    def decode_WhileNode(self,condition_node,body_node,return_null):
+        return WhileNode(self.decode(condition_node),self.decode(body_node),return_null)
+
+    def decode_FuncDefNode(self,var_name_tok,arg_name_toks,body_node,return_null):
+        return FuncDefNode(self.decode_token(var_name_tok),[self.decode_token(tok) for tok in arg_name_toks],
+        self.decode(body_node),return_null)
+
+    def decode_CallNode(self,node_to_call,arg_nodes):
+        return CallNode(self.decode(node_to_call),[self.decode(arg) for arg in arg_nodes])
+
+def artifact_header(key):
+    return ARTIFACT_MAGIC+bytes((ARTIFACT_VERSION,marshal.version))+bytes.fromhex(key[1])
+
+def artifact_current(path,key):
+    header=artifact_header(key)
+    try:
+        with open(path,"rb") as file:
+            return file.read(len(header))==header
+    except OSError:
+        return False
+
+def save_artifact(path,key,node):
+    gc_enabled=gc.isenabled()
+    gc.disable()
+    try:
+        data=artifact_header(key)+zlib.compress(marshal.dumps(ArtifactWriter().encode(node)))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    temp_path=f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path,"wb") as file:
+            file.write(data)
+        os.replace(temp_path,path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def load_artifact(path,filename,text,key=None):
+    if key is None:
+        key=source_key(filename,text)
+    header=artifact_header(key)
+    try:
+        with open(path,"rb") as file:
+            data=file.read()
+    except OSError:
+        return None
+    if not data.startswith(header):
+        return None
+    gc_enabled=gc.isenabled()
+    gc.disable()
+    try:
+        tree=marshal.loads(zlib.decompress(data[len(header):]))
+        return ArtifactReader(Source(filename,text)).decode(tree)
+    except (zlib.error,ValueError,EOFError,TypeError,AttributeError,IndexError,KeyError):
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+#Constant Folding
+MAX_FOLDED_BITS=1024
+MAX_FOLDED_LENGTH=4096
+
+class ConstantFolder:
+    def __init__(self):
+        self.constants={}
+
+    def visit(self,node):
+        if node is None:
+            return None
+        method=getattr(self,f'visit_{type(node).__name__}',None)
+        if method:
+            return method(node)
+        return node
+
+    def constant_value(self,node):
+        if isinstance(node,NumberNode):
+            return Number(node.tok.value)
+        if isinstance(node,StringNode):
+            return String(node.tok.value)
+        return None
+
+    def shared(self,type_,value):
+        key=(type_,repr(value) if isinstance(value,float) else value)
+        return self.constants.setdefault(key,value)
+
+    def constant_node(self,value,node):
+        if isinstance(value,String):
+            if len(value.value)>MAX_FOLDED_LENGTH:
+                return node
+            type_,node_class=T_STRING,StringNode
+        elif isinstance(value,Number) and type(value.value) is int:
+            if value.value.bit_length()>MAX_FOLDED_BITS:
+                return node
+            type_,node_class=T_INT,NumberNode
+        elif isinstance(value,Number) and type(value.value) is float and math.isfinite(value.value):
+            type_,node_class=T_FLOAT,NumberNode
+        else:
+            return node
+        tok=Token(type_,self.shared(type_,value.value),node.start.source,node.start.index,node.end.index)
+        return node_class(tok)
+
+    def too_large(self,left,method_name,right):
+        if method_name=="power" and type(left.value) is int and type(right.value) is int and right.value>0:
+            return max(left.value.bit_length(),1)*right.value>MAX_FOLDED_BITS
+        if method_name=="multiply" and isinstance(left,String) and type(right.value) is int:
+            return len(left.value)*right.value>MAX_FOLDED_LENGTH
+        return False
+
+    def visit_NumberNode(self,node):
+        node.tok.value=self.shared(node.tok.type,node.tok.value)
+        return node
+
+    def visit_StringNode(self,node):
+        node.tok.value=self.shared(node.tok.type,node.tok.value)
+        return node
+
+    def visit_ListNode(self,node):
+        node.element_nodes=[self.visit(element) for element in node.element_nodes]
+        return node
+
+    def visit_DictionaryNode(self,node):
+        node.key_nodes=[self.visit(key) for key in node.key_nodes]
+        node.value_nodes=[self.visit(value) for value in node.value_nodes]
+        return node
+
+    def visit_VarAssignNode(self,node):
+        node.value_node=self.visit(node.value_node)
+        return node
+
+    def visit_BinaryOpnode(self,node):
+        node.left_node=self.visit(node.left_node)
+        node.right_node=self.visit(node.right_node)
+        left=self.constant_value(node.left_node)
+        right=self.constant_value(node.right_node)
+        if left is None or right is None:
+            return node
+
+        method_name=node.method_name
+        if self.too_large(left,method_name,right):
+            return node
+        try:
+            result,error=getattr(left,method_name)(right)
+        except Exception:
+            return node
+        if error:
+            return node
+        return self.constant_node(result,node)
+
+    def visit_UnaryOpnode(self,node):
+        node.node=self.visit(node.node)
+        value=self.constant_value(node.node)
+        if value is None:
+            return node
+
+        error=None
+        try:
+            if node.operator.type==T_MINUS:
+                value,error=value.multiply(Number(-1))
+            elif node.operator.matches(T_KEYWORD,"not"):
+                value,error=value.notop()
+        except Exception:
+            return node
+        if error:
+            return node
+        return self.constant_node(value,node)
+
+    def visit_IfNode(self,node):
+        visited=[(self.visit(condition),self.visit(expression),return_null) for condition,expression,return_null in node.cases]
+        else_case=node.else_case
+        if else_case:
+            else_case=(self.visit(else_case[0]),else_case[1])
+        cases=[]
+
+        for condition,expression,return_null in visited:
+            value=self.constant_value(condition)
+            if value is None:
+                cases.append((condition,expression,return_null))
+            elif value.is_true():
+                if not cases and not return_null:
+                    return expression
+                cases.append((condition,expression,return_null))
+                else_case=None
+                break
+
+        if not cases:
+            if else_case and not else_case[1]:
+                return else_case[0]
+            cases.append(visited[0])
+
+        node.cases=cases
+        node.else_case=else_case
+        return node
+
+    def visit_ForNode(self,node):
+        node.start_value_node=self.visit(node.start_value_node)
+        node.end_value_node=self.visit(node.end_value_node)
+        node.step_value_node=self.visit(node.step_value_node)
+        node.body_node=self.visit(node.body_node)
+        return node
+
+    def visit_WhileNode(self,node):
+        node.condition_node=self.visit(node.condition_node)
+        node.body_node=self.visit(node.body_node)
+        return node
+
+    def visit_FuncDefNode(self,node):
+        node.body_node=self.visit(node.body_node)
+        return node
+
+    def visit_CallNode(self,node):
+        node.node_to_call=self.visit(node.node_to_call)
+        node.arg_nodes=[self.visit(arg) for arg in node.arg_nodes]
+        return node
+
+#Variable Resolution
+GLOBAL_DEPTH=-1
+frame_names=set()
+
+class Resolver:
+    def __init__(self,global_table):
+        self.global_table=global_table
+        self.layout=None
+        self.pending=None
+
+    def resolve(self,node):
+        self.visit(node)
+        return node
+
+    def visit(self,node):
+        if node is None:
+            return
+        method=getattr(self,f'visit_{type(node).__name__}',None)
+        if method:
+            method(node)
+
+    def load(self,node,name):
+        if self.layout is None:
+            node.address=(0,self.global_table.declare(name))
+        else:
+            self.pending.append(node)
+
+    def store(self,node,name):
+        if self.layout is None:
+            node.address=(0,self.global_table.declare(name))
+        else:
+            node.address=(0,self.layout.setdefault(name,len(self.layout)))
+
+    def visit_ListNode(self,node):
+        for element_node in node.element_nodes:
+            self.visit(element_node)
+
+    def visit_DictionaryNode(self,node):
+        for key_node in node.key_nodes:
+            self.visit(key_node)
+        for value_node in node.value_nodes:
+            self.visit(value_node)
+
+    def visit_VarAccessNode(self,node):
+        self.load(node,node.var_name_tok.value)
+
+    def visit_VarAssignNode(self,node):
+        self.visit(node.value_node)
+        self.store(node,node.var_name_tok.value)
+
+    def visit_BinaryOpnode(self,node):
+        self.visit(node.left_node)
+        self.visit(node.right_node)
+
+    def visit_UnaryOpnode(self,node):
+        self.visit(node.node)
+
+    def visit_IfNode(self,node):
+        for condition,expression,return_null in node.cases:
+            self.visit(condition)
+            self.visit(expression)
+        if node.else_case:
+            self.visit(node.else_case[0])
+
+    def visit_ForNode(self,node):
+        self.visit(node.start_value_node)
+        self.visit(node.end_value_node)
+        self.visit(node.step_value_node)
+        self.store(node,node.var_name_tok.value)
+        self.visit(node.body_node)
+
+    def visit_WhileNode(self,node):
+        self.visit(node.condition_node)
+        self.visit(node.body_node)
+
+    def visit_FuncDefNode(self,node):
+        if node.var_name_tok:
+            self.store(node,node.var_name_tok.value)
+
+        enclosing=self.layout,self.pending
+        self.layout={}
+        self.pending=[]
+        for arg_name_tok in node.arg_name_toks:
+            self.layout.setdefault(arg_name_tok.value,len(self.layout))
+        self.visit(node.body_node)
+
+        for access_node in self.pending:
+            name=access_node.var_name_tok.value
+            slot=self.layout.get(name)
+            if slot is None:
+                access_node.address=(GLOBAL_DEPTH,self.global_table.declare(name))
+            else:
+                access_node.address=(0,slot)
+        frame_names.update(self.layout)
+        node.layout=self.layout
+        self.layout,self.pending=enclosing
+
+    def visit_CallNode(self,node):
+        self.visit(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.visit(arg_node)
+
+#Result Usage
+#Marks the loops and blocks whose value is never read so they run as statements
+class ResultUsage:
+    def mark(self,node,used=True):
+        method=getattr(self,f'mark_{type(node).__name__}',None)
+        if method:
+            method(node,used)
+        return node
+
+    def mark_ListNode(self,node,used):
+        node.discard=not used
+        for element_node in node.element_nodes:
+            self.mark(element_node,used)
+
+    def mark_DictionaryNode(self,node,used):
+        for key_node in node.key_nodes:
+            self.mark(key_node)
+        for value_node in node.value_nodes:
+            self.mark(value_node)
+
+    def mark_VarAssignNode(self,node,used):
+        self.mark(node.value_node)
+
+    def mark_BinaryOpnode(self,node,used):
+        self.mark(node.left_node)
+        self.mark(node.right_node)
+
+    def mark_UnaryOpnode(self,node,used):
+        self.mark(node.node)
+
+    def mark_IfNode(self,node,used):
+        for condition,expression,return_null in node.cases:
+            self.mark(condition)
+            self.mark(expression,used and not return_null)
+        if node.else_case:
+            expression,return_null=node.else_case
+            self.mark(expression,used and not return_null)
+
+    def mark_ForNode(self,node,used):
+        if not used:
+            node.return_null=True
+        self.mark(node.start_value_node)
+        self.mark(node.end_value_node)
+        if node.step_value_node:
+            self.mark(node.step_value_node)
+        self.mark(node.body_node,not node.return_null)
+
+    def mark_WhileNode(self,node,used):
+        if not used:
+            node.return_null=True
+        self.mark(node.condition_node)
+        self.mark(node.body_node,not node.return_null)
+
+    def mark_FuncDefNode(self,node,used):
+        self.mark(node.body_node,not node.return_null)
+
+    def mark_CallNode(self,node,used):
+        self.mark(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.mark(arg_node)
+
+#Expression Caching
+#Pure expressions that cannot change inside a loop, or that repeat within one expression, are computed
+#once per activation of their scope and reused. Values are cached lazily on first evaluation, so errors
+#surface at the same point as before and mutable results are never shared.
+LIST_RESULTS=frozenset(("add","subtract","multiply","index"))
+DICTIONARY_RESULTS=frozenset(("add","index"))
+
+def enter_cache_scope(node,context):
+    cache=context.cache
+    if cache is None:
+        cache=context.cache={}
+    symbol_table=context.symbol_table
+    enabled=all(symbol_table.lookup(name,address) is function for name,address,function in node.guards)
+    for slot in node.slots:
+        cache[slot]=None if enabled else False
+
+class CacheRegion:
+    __slots__=("assigned","writes","calls","slots","guards")
+
+    def __init__(self,assigned):
+        self.assigned=assigned
+        self.writes=False
+        self.calls={}
+        self.slots={}
+        self.guards={}
+
+    def guard(self,callee):
+        name=callee.var_name_tok.value
+        self.guards[name]=(name,callee.address,getattr(BuiltInFunction,builtin_functions[name]))
+
+class ExpressionCacher:
+    def __init__(self):
+        self.infos={}
+        self.regions=[]
+        self.slot_count=0
+
+    def optimize(self,node):
+        return self.visit(node)
+
+    def visit(self,node):
+        if node is None:
+            return None
+        if self.info(node) is not None:
+            return self.common(self.invariant(node))
+        method=getattr(self,f'visit_{type(node).__name__}',None)
+        if method:
+            return method(node)
+        return node
+
+    def new_slot(self):
+        self.slot_count+=1
+        return self.slot_count
+
+    def trivial(self,node):
+        if type(node) is UnaryOpnode:
+            return self.trivial(node.node)
+        return type(node) in (NumberNode,StringNode,VarAccessNode)
+
+    def may_return(self,node,methods):
+        if type(node) is BinaryOpnode:
+            return node.method_name in methods
+        if type(node) is UnaryOpnode:
+            return not node.operator.matches(T_KEYWORD,"not") and self.may_return(node.node,methods)
+        return type(node) not in (NumberNode,StringNode)
+
+    #List subtraction pops from its left operand and dictionary addition inserts into it
+    def mutates(self,node):
+        method_name=node.method_name
+        if method_name=="subtract":
+            return self.may_return(node.left_node,LIST_RESULTS)
+        if method_name=="add":
+            return self.may_return(node.left_node,DICTIONARY_RESULTS)
+        return False
+
+    def info(self,node):
+        node_id=id(node)
+        if node_id not in self.infos:
+            self.infos[node_id]=self.expression(node)
+        return self.infos[node_id]
+
+    #Returns (key,names read,reads memory,may mutate,builtin callees) for pure expressions, otherwise None
+    def expression(self,node):
+        node_type=type(node)
+        if node_type is NumberNode:
+            return ("number",type(node.tok.value),node.tok.value),frozenset(),False,False,()
+        if node_type is StringNode:
+            return ("string",node.tok.value),frozenset(),False,False,()
+        if node_type is VarAccessNode:
+            return ("name",node.var_name_tok.value),frozenset((node.var_name_tok.value,)),False,False,()
+
+        if node_type is BinaryOpnode:
+            left=self.info(node.left_node)
+            right=self.info(node.right_node)
+            if left is None or right is None:
+                return None
+            method_name=node.method_name
+            memory=left[2] or right[2] or method_name=="index"
+            mutates=left[3] or right[3] or self.mutates(node)
+            if memory and mutates:
+                return None
+            return (method_name,left[0],right[0]),left[1]|right[1],memory,mutates,left[4]+right[4]
+
+        if node_type is UnaryOpnode:
+            value=self.info(node.node)
+            if value is None:
+                return None
+            return (node.operator.type,node.operator.value,value[0]),value[1],value[2],value[3],value[4]
+
+        if node_type is CallNode:
+            callee=node.node_to_call
+            if type(callee) is not VarAccessNode:
+                return None
+            name=callee.var_name_tok.value
+            if name not in builtin_functions or name in builtin_effects:
+                return None
+            args=[self.info(arg_node) for arg_node in node.arg_nodes]
+            if any(arg is None or arg[3] for arg in args):
+                return None
+            key=("call",name)+tuple(arg[0] for arg in args)
+            names=frozenset((name,)).union(*(arg[1] for arg in args))
+            return key,names,True,False,(callee,)+tuple(callee for arg in args for callee in arg[4])
+
+        return None
+
+    def rewrite(self,node,function):
+        if type(node) is BinaryOpnode:
+            node.left_node=function(node.left_node)
+            node.right_node=function(node.right_node)
+        elif type(node) is UnaryOpnode:
+            node.node=function(node.node)
+        elif type(node) is CallNode:
+            node.arg_nodes=[function(arg_node) for arg_node in node.arg_nodes]
+        return node
+
+    #Loop invariant code motion: cache in the outermost loop that neither assigns a name the expression
+    #reads nor, for expressions that read lists or dictionaries, may mutate one
+    def invariant(self,node):
+        if not self.trivial(node):
+            info=self.info(node)
+            for region in self.regions:
+                if not info[1]&region.assigned and not (info[2] and region.writes):
+                    return self.cached(node,info,region)
+        return self.rewrite(node,self.invariant)
+
+    def cached(self,node,info,region):
+        slot=region.slots.get(info[0])
+        if slot is None:
+            slot=region.slots[info[0]]=self.new_slot()
+        for callee in info[4]:
+            region.guard(callee)
+        if info[2]:
+            for callee in region.calls.values():
+                region.guard(callee)
+        return CachedNode(node,slot)
+
+    #Common subexpression elimination within one pure expression
+    def common(self,node):
+        if type(node) is CachedNode:
+            return node
+        counts={}
+        self.count(node,counts,not self.info(node)[4])
+        repeated={key for key,count in counts.items() if count>1}
+        if not repeated:
+            return node
+        slots={}
+        node=self.share(node,repeated,slots)
+        return CacheScopeNode(node,list(slots.values()),[])
+
+    def count(self,node,counts,call_free):
+        if type(node) is CachedNode:
+            return node
+        if not self.trivial(node):
+            info=self.info(node)
+            if not info[4] and (call_free or not info[2]):
+                counts[info[0]]=counts.get(info[0],0)+1
+        return self.rewrite(node,lambda child:self.count(child,counts,call_free))
+
+    def share(self,node,repeated,slots):
+        if type(node) is CachedNode:
+            return node
+        if not self.trivial(node) and self.info(node)[0] in repeated:
+            key=self.info(node)[0]
+            if key not in slots:
+                slots[key]=self.new_slot()
+            return CachedNode(node,slots[key])
+        return self.rewrite(node,lambda child:self.share(child,repeated,slots))
+
+    #Effect analysis of a loop: names it assigns, builtins it calls and whether it may mutate a list or dictionary
+    def region(self,nodes,assigned):
+        region=CacheRegion(assigned)
+        for node in nodes:
+            self.effects(node,region)
+        if not region.calls.keys().isdisjoint(region.assigned):
+            region.writes=True
+        return region
+
+    def effects(self,node,region):
+        node_type=type(node)
+        if node_type is VarAssignNode:
+            region.assigned.add(node.var_name_tok.value)
+        elif node_type is ForNode:
+            region.assigned.add(node.var_name_tok.value)
+        elif node_type is FuncDefNode:
+            if node.var_name_tok:
+                region.assigned.add(node.var_name_tok.value)
+        elif node_type is CallNode:
+            callee=node.node_to_call
+            name=callee.var_name_tok.value if type(callee) is VarAccessNode else None
+            if name in builtin_functions and builtin_effects.get(name)!="write":
+                region.calls[name]=callee
+            else:
+                region.writes=True
+        elif node_type is BinaryOpnode:
+            if self.mutates(node):
+                region.writes=True
+        for child in self.children(node):
+            self.effects(child,region)
+
+    def children(self,node):
+        node_type=type(node)
+        if node_type is ListNode:
+            return node.element_nodes
+        if node_type is DictionaryNode:
+            return node.key_nodes+node.value_nodes
+        if node_type is VarAssignNode:
+            return [node.value_node]
+        if node_type is BinaryOpnode:
+            return [node.left_node,node.right_node]
+        if node_type is UnaryOpnode:
+            return [node.node]
+        if node_type is IfNode:
+            children=[node_ for condition,expression,return_null in node.cases for node_ in (condition,expression)]
+            if node.else_case:
+                children.append(node.else_case[0])
+            return children
+        if node_type is ForNode:
+            return [child for child in (node.start_value_node,node.end_value_node,node.step_value_node,node.body_node) if child]
+        if node_type is WhileNode:
+            return [node.condition_node,node.body_node]
+        if node_type is CallNode:
+            return [node.node_to_call]+node.arg_nodes
+        return []
+
+    def scope(self,node,region):
+        if not region.slots:
+            return node
+        return CacheScopeNode(node,list(region.slots.values()),list(region.guards.values()))
+
+    def visit_ListNode(self,node):
+        node.element_nodes=[self.visit(element) for element in node.element_nodes]
+        return node
+
+    def visit_DictionaryNode(self,node):
+        node.key_nodes=[self.visit(key) for key in node.key_nodes]
+        node.value_nodes=[self.visit(value) for value in node.value_nodes]
+        return node
+
+    def visit_VarAssignNode(self,node):
+        node.value_node=self.visit(node.value_node)
+        return node
+
+    def visit_BinaryOpnode(self,node):
+        node.left_node=self.visit(node.left_node)
+        node.right_node=self.visit(node.right_node)
+        return node
+
+    def visit_UnaryOpnode(self,node):
+        node.node=self.visit(node.node)
+        return node
+
+    def visit_IfNode(self,node):
+        node.cases=[(self.visit(condition),self.visit(expression),return_null) for condition,expression,return_null in node.cases]
+        if node.else_case:
+            node.else_case=(self.visit(node.else_case[0]),node.else_case[1])
+        return node
+
+    def visit_ForNode(self,node):
+        node.start_value_node=self.visit(node.start_value_node)
+        node.end_value_node=self.visit(node.end_value_node)
+        node.step_value_node=self.visit(node.step_value_node)
+        region=self.region([node.body_node],{node.var_name_tok.value})
+        self.regions.append(region)
+        node.body_node=self.visit(node.body_node)
+        self.regions.pop()
+        return self.scope(node,region)
+
+    def visit_WhileNode(self,node):
+        region=self.region([node.condition_node,node.body_node],set())
+        self.regions.append(region)
+        node.condition_node=self.visit(node.condition_node)
+        node.body_node=self.visit(node.body_node)
+        self.regions.pop()
+        return self.scope(node,region)
+
+    def visit_FuncDefNode(self,node):
+        enclosing=self.regions
+        self.regions=[]
+        node.body_node=self.visit(node.body_node)
+        self.regions=enclosing
+        return node
+
+    def visit_CallNode(self,node):
+        node.node_to_call=self.visit(node.node_to_call)
+        node.arg_nodes=[self.visit(arg) for arg in node.arg_nodes]
+        return node
+
+#RunTimeResult Class
+class RunTimeResult:
+    __slots__=("value","error")
+
+    def __init__(self):
+        self.value=None
+        self.error=None
+    
+    def register(self,res):
+        if res.error:
+            self.error=res.error
+        return res.value
+    
+    def success(self,value):
+        self.value=value
+        return self
+
+    def failure(self,error):
+        self.error=error
+        return self
+
+#RunTimeException Class
+class RunTimeException(Exception):
+    def __init__(self,error):
+        super().__init__(error.details)
+        self.error=error
+
+class TailCall:
+    __slots__=("function","args","node","context")
+
+    def __init__(self,function,args,node=None,context=None):
+        self.function=function
+        self.args=args
+        self.node=node
+        self.context=context
+
+#Value Class
+class Value:
+    __slots__=()
+
+    immutable=False
+    start=None
+    end=None
+    context=None
+
+    def __init__(self):
+        self.start=None
+        self.end=None
+        self.context=None
+    
+    def set_pos(self,start=None,end=None):
+        self.start=start
+        self.end=end
+        return self
+
+    def set_context(self,context=None):
+        self.context=context
+        return self
+
+    def add(self,other):
+        return None,self.illegal_operation(other)
+    
+    def subtract(self,other):
+        return None,self.illegal_operation(other)
+
+    def multiply(self,other):
+        return None,self.illegal_operation(other)
+
+    def divide(self,other):
+        return None,self.illegal_operation(other)
+    
+    def floor_divide(self,other):
+        return None,self.illegal_operation(other)
+
+    def modulo(self,other):
+        return None,self.illegal_operation(other)
+
+    def power(self,other):
+        return None,self.illegal_operation(other)
+
+    def index(self,other):
+        return None,self.illegal_operation(other)
+
+    def comparison_equal(self,other):
+        return None,self.illegal_operation(other)
+
+    def comparison_notequal(self,other):
+        return None,self.illegal_operation(other)
+
+    def comparison_lessthanequal(self,other):
+        return None,self.illegal_operation(other)
+
+    def comparison_greaterthanequal(self,other):
+        return None,self.illegal_operation(other)
+
+    def comparison_greaterthan(self,other):
+        return None,self.illegal_operation(other)
+
+    def comparison_lessthan(self,other):
+        return None,self.illegal_operation(other)
+
+    def andop(self,other):
+        return None,self.illegal_operation(other)
+
+    def orop(self,other):
+        return None,self.illegal_operation(other)
+
+    def notop(self):
+        return None,self.illegal_operation()
+
+    def execute(self,args):
+        return RunTimeResult().failure(self.illegal_operation())
+
+    def copy(self):
+        raise Exception("No Copy Method Defined")
+
+    def located(self,start,end,context):
+        return self.copy().set_pos(start,end).set_context(context)
+
+    def is_true(self):
+        return False
+
+    def illegal_operation(self,other=None):
+        if not other:
+            other=self
+        return RunTimeError(self.start,other.end,"Illegal Operation",self.context)
+
+#Number Class
+SMALL_INT_MIN=-5
+SMALL_INT_MAX=256
+small_ints=[]
+
+class Number(Value):
+    __slots__=("value",)
+
+    immutable=True
+
+    def __new__(cls,value):
+        if type(value) is int and SMALL_INT_MIN<=value<=SMALL_INT_MAX and small_ints:
+            return small_ints[value-SMALL_INT_MIN]
+        number=object.__new__(cls)
+        number.value=value
+        return number
+
+    def __init__(self,value):
+        pass
+
+    def set_pos(self,start=None,end=None):
+        return self
+
+    def set_context(self,context=None):
+        return self
+
+    def add(self,other):
+        if isinstance(other,Number):
+            return Number(self.value+other.value),None
+        else:
+            return None,Value.illegal_operation(self,other)
+
+    def subtract(self,other):
+        if isinstance(other,Number):
+            return Number(self.value-other.value),None
+        else:
+            return None,Value.illegal_operation(self,other)
+
+    def multiply(self,other):
+        if isinstance(other,Number):
+            return Number(self.value*other.value),None
+        else:
+            return None,Value.illegal_operation(self,other)
+
+    def divide(self,other):
+        if isinstance(other,Number):
+            if other.value==0:
+                return None,RunTimeError(other.start,other.end,"Division By Zero",self.context)
+            return Number(self.value/other.value),None
         else:
             return None,Value.illegal_operation(self,other)
 
@@ -1319,7 +2370,7 @@ class Number(Value):
         if isinstance(other,Number):
             if other.value==0:
                 return None,RunTimeError(other.start,other.end,"Division By Zero",self.context)
-            return Number(self.value//other.value).set_context(self.context),None
+            return Number(self.value//other.value),None
         else:
             return None,Value.illegal_operation(self,other)
 
@@ -1327,120 +2378,149 @@ class Number(Value):
         if isinstance(other,Number):
             if other.value==0:
                 return None,RunTimeError(other.start,other.end,"Modulo By Zero",self.context)
-            return Number(self.value%other.value).set_context(self.context),None
+            return Number(self.value%other.value),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def power(self,other):
         if isinstance(other,Number):
-            return Number(self.value**other.value).set_context(self.context),None
+            return Number(self.value**other.value),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def comparison_equal(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value==other.value)).set_context(self.context),None
+            return Number(int(self.value==other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def comparison_notequal(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value!=other.value)).set_context(self.context),None
+            return Number(int(self.value!=other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def comparison_lessthanequal(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value<=other.value)).set_context(self.context),None
+            return Number(int(self.value<=other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def comparison_greaterthanequal(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value>=other.value)).set_context(self.context),None
+            return Number(int(self.value>=other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def comparison_greaterthan(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value>other.value)).set_context(self.context),None
+            return Number(int(self.value>other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def comparison_lessthan(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value<other.value)).set_context(self.context),None
+            return Number(int(self.value<other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def andop(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value and other.value)).set_context(self.context),None
+            return Number(int(self.value and other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def orop(self,other):
         if isinstance(other,Number):
-            return Number(int(self.value or other.value)).set_context(self.context),None
+            return Number(int(self.value or other.value)),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def notop(self):
-        return Number(1 if self.value==0 else 0).set_context(self.context),None
+        return Number(1 if self.value==0 else 0),None
 
     def copy(self):
-        copy=Number(self.value)
-        copy.set_pos(self.start,self.end)
-        copy.set_context(self.context)
-        return copy
+        return self
+
+    def located(self,start,end,context):
+        number=object.__new__(LocatedNumber)
+        number.value=self.value
+        number.start=start
+        number.end=end
+        number.context=context
+        return number
 
     def is_true(self):
         return self.value!=0
+
+    def __eq__(self,other):
+        return isinstance(other,Number) and self.value==other.value
+
+    def __hash__(self):
+        return hash(self.value)
     
     def __repr__(self):
         return str(self.value)
 
+class LocatedNumber(Number):
+    __slots__=("start","end","context")
+
+small_ints.extend([Number(value) for value in range(SMALL_INT_MIN,SMALL_INT_MAX+1)])
 Number.null=Number(0)
 Number.false=Number(0)
 Number.true=Number(1)
 
 class  String(Value):
+    __slots__=("value",)
+
+    immutable=True
+
     def __init__(self,value):
-        super().__init__()
         self.value=value
 
+    def set_pos(self,start=None,end=None):
+        return self
+
+    def set_context(self,context=None):
+        return self
+
     def add(self,other):
         if isinstance(other,String):
-            return String(self.value+other.value).set_context(self.context),None
+            value=other.value
+            if len(self.value)+len(value)<ROPE_MIN_LENGTH:
+                return String(self.value+value),None
+            return RopeString([self.value,value]),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def multiply(self, other):
         if isinstance(other,Number):
-            return String(self.value*other.value).set_context(self.context),None
+            return String(self.value*other.value),None
         else:
             return None,Value.illegal_operation(self,other)
 
     def index(self, other):
         if isinstance(other,Number):
             try:
-                if other.value==0:
+                index=other.value
+                if index==0:
                     return None,RunTimeError(other.start,other.end,'String index out of range',self.context)
-                elif other.value>0:
-                    other.value-=1
-                return String(self.value[other.value]).set_context(self.context),None
+                elif index>0:
+                    index-=1
+                return String(self.value[index]),None
             except:
                 return None,RunTimeError(other.start,other.end,'String index out of range',self.context)
         elif isinstance(other,List):
             try:
-                word=''
+                characters=[]
                 for i in other.elements:
-                    if i.value==0:
+                    index=i.value
+                    if index==0:
                         return None,RunTimeError(other.start,other.end,'String index out of range',self.context)
-                    elif i.value>0:
-                        i.value-=1
-                    word+=self.value[i.value]
-                return String(word).set_context(self.context),None
+                    elif index>0:
+                        index-=1
+                    characters.append(self.value[index])
+                return String("".join(characters)),None
             except:
                 return None,RunTimeError(other.start,other.end,'String index out of range',self.context)
         else:
@@ -1449,11 +2529,21 @@ class  String(Value):
     def  is_true(self):
         return len(self.value)>0
 
+    def __eq__(self,other):
+        return isinstance(other,String) and self.value==other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
     def copy(self):
-        copy=String(self.value)
-        copy.set_pos(self.start,self.end)
-        copy.set_context(self.context)
-        return copy
+        return self
+
+    def located(self,start,end,context):
+        string=LocatedString(self.value)
+        string.start=start
+        string.end=end
+        string.context=context
+        return string
 
     def __str__(self):
         return self.value
@@ -1461,29 +2551,172 @@ class  String(Value):
     def __repr__(self) -> str:
         return f'"{self.value}"'
 
-class List(Value):
-    def __init__(self,elements):
-        super().__init__()
-        self.elements=elements
+class LocatedString(String):
+    __slots__=("start","end","context")
+
+#Rope Strings
+ROPE_MIN_LENGTH=64
+
+class RopeString(String):
+    __slots__=("text","pieces","count")
+
+    def __init__(self,pieces):
+        self.text=None
+        self.pieces=pieces
+        self.count=len(pieces)
+
+    @property
+    def value(self):
+        if self.text is None:
+            pieces=self.pieces
+            self.text="".join(pieces if len(pieces)==self.count else pieces[:self.count])
+            self.pieces=[self.text]
+            self.count=1
+        return self.text
 
     def add(self,other):
-        if isinstance(other,List):
-            return List(self.elements+other.elements).set_context(self.context),None
+        if isinstance(other,String):
+            pieces=self.pieces
+            if len(pieces)!=self.count:
+                pieces=pieces[:self.count]
+            pieces.append(other.value)
+            return RopeString(pieces),None
         else:
             return None,Value.illegal_operation(self,other)
 
-    def subtract(self, other):
-        if isinstance(other,Number):
-            new_list=self.copy()
+#Number Arrays
+PACKED_LIST_MIN=16
+PACKED_TYPECODES={int:"q",float:"d"}
+
+def packed_array(values):
+    if len(values)<PACKED_LIST_MIN:
+        return None
+    types=set(map(type,values))
+    if len(types)!=1:
+        return None
+    typecode=PACKED_TYPECODES.get(types.pop())
+    if typecode is None:
+        return None
+    try:
+        return array(typecode,values)
+    except OverflowError:
+        return None
+
+def pack_values(values):
+    packed=packed_array(values)
+    if packed is None:
+        return [Number(value) for value in values]
+    return NumberArray(packed)
+
+def pack_numbers(elements):
+    if len(elements)<PACKED_LIST_MIN:
+        return elements
+    values=[element.value for element in elements if type(element) is Number]
+    if len(values)!=len(elements):
+        return elements
+    packed=packed_array(values)
+    if packed is None:
+        return elements
+    return NumberArray(packed)
+
+def number_values(elements):
+    if type(elements) is NumberArray and elements.packed:
+        return elements.values
+    values=[element.value for element in elements if isinstance(element,Number)]
+    if len(values)!=len(elements):
+        return None
+    return values
+
+class NumberArray:
+    __slots__=("values",)
+
+    def __init__(self,values):
+        self.values=values
+
+    @property
+    def packed(self):
+        return type(self.values) is array
+
+    def matches(self,other):
+        return self.packed and type(other) is NumberArray and other.packed and self.values.typecode==other.values.typecode
+
+    def unpack(self):
+        if self.packed:
+            self.values=[Number(value) for value in self.values]
+        return self.values
+
+    def append(self,value):
+        if self.packed and type(value) is Number and PACKED_TYPECODES.get(type(value.value))==self.values.typecode:
             try:
-                new_list.elements.pop(other.value)
-                return new_list,None
-            except:
-                return None,RunTimeError(other.start,other.end,'List index out of range',self.context)
+                self.values.append(value.value)
+                return
+            except OverflowError:
+                pass
+        self.unpack().append(value)
+
+    def extend(self,other):
+        if self.matches(other):
+            self.values.extend(other.values)
         else:
-            return None,Value.illegal_operation(self,other)
+            for value in list(other):
+                self.append(value)
 
-    def multiply(self, other):
+    def pop(self,index=-1):
+        if self.packed:
+            return Number(self.values.pop(index))
+        return self.values.pop(index)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        if self.packed:
+            return map(Number,self.values)
+        return iter(self.values)
+
+    def __getitem__(self,index):
+        if self.packed:
+            return Number(self.values[index])
+        return self.values[index]
+
+    def __add__(self,other):
+        if self.matches(other):
+            return NumberArray(self.values+other.values)
+        return list(self)+list(other)
+
+    def __radd__(self,other):
+        return list(other)+list(self)
+
+    def __mul__(self,count):
+        if self.packed:
+            return NumberArray(self.values*count)
+        return self.values*count
+
+class List(Value):
+    __slots__=("start","end","context","elements")
+
+    def __init__(self,elements):
+        super().__init__()
+        self.elements=elements
+
+    def add(self,other):
+        if isinstance(other,List):
+            return List(self.elements+other.elements).set_context(self.context),None
+        else:
+            return None,Value.illegal_operation(self,other)
+
+    def subtract(self, other):
+        if isinstance(other,Number):
+            new_list=self.copy()
+            try:
+                new_list.elements.pop(other.value)
+                return new_list,None
+            except:
+                return None,RunTimeError(other.start,other.end,'List index out of range',self.context)
+        else:
+            return None,Value.illegal_operation(self,other)
+
+    def multiply(self, other):
         if isinstance(other,Number):
             return List(self.elements*other.value).set_context(self.context),None
         else:
@@ -1492,25 +2725,24 @@ class List(Value):
     def index(self, other):
         if isinstance(other,Number):
             try:
-                if other.value==0:
+                index=other.value
+                if index==0:
                     return None,RunTimeError(other.start,other.end,'List index out of range',self.context)
-                elif other.value>0:
-                    other.value-=1
-                if isinstance(self.elements[other.value],String):
-                    return String(self.elements[other.value].value).set_context(self.context),None
-                elif isinstance(self.elements[other.value],Number):
-                    return Number(self.elements[other.value]).set_context(self.context),None
+                elif index>0:
+                    index-=1
+                return self.elements[index].copy().set_context(self.context),None
             except:
                 return None,RunTimeError(other.start,other.end,'List index out of range',self.context)
         elif isinstance(other,List):
             try:
                 listresult=[]
                 for i in other.elements:
-                    if i.value==0:
+                    index=i.value
+                    if index==0:
                         return None,RunTimeError(other.start,other.end,'List index out of range',self.context)
-                    elif i.value>0:
-                        i.value-=1
-                    listresult.append(self.elements[i.value])
+                    elif index>0:
+                        index-=1
+                    listresult.append(self.elements[index])
                 return List(listresult).set_context(self.context),None
             except:
                 return None,RunTimeError(other.start,other.end,'List index out of range',self.context)
@@ -1530,44 +2762,50 @@ class List(Value):
         return f'[{", ".join([repr(x) for x in self.elements])}]'
 
 class Dictionary(Value):
-    def __init__(self,key,value):
-        super().__init__()
-        self.key=key
-        self.value=value
-        self.key_value=[]
+    __slots__=("start","end","context","entries")
 
-        for i in range(len(self.key)):
-            self.key_value.append((self.key[i],self.value[i]))
+    def __init__(self,entries):
+        super().__init__()
+        self.entries=entries
 
     def add(self,other):
-        if isinstance(other,List):
-            self.key.append(other.elements[0])
-            self.value.append(other.elements[1])
-
-            return Dictionary(self.key,self.value).set_context(self.context),None
+        if isinstance(other,List) and len(other.elements)==2:
+            key,value=other.elements
+            self.entries[key]=value
+            return Dictionary(self.entries).set_context(self.context),None
         else:
             return None,Value.illegal_operation(self,other)
 
+    def index(self,other):
+        try:
+            value=self.entries[other]
+        except KeyError:
+            return None,RunTimeError(other.start,other.end,'Key not found in dictionary',self.context)
+        return value.copy().set_context(self.context),None
+
     def copy(self):
-        copy=Dictionary(self.key,self.value)
+        copy=Dictionary(self.entries)
         copy.set_pos(self.start,self.end)
         copy.set_context(self.context)
         return copy
 
     def __str__(self) -> str:
-        return ",".join([str(x[0])+':'+str(x[1]) for x in self.key_value])
+        return ",".join([str(key)+':'+str(value) for key,value in self.entries.items()])
 
     def __repr__(self):
-        return "{"+",".join([str(x[0])+':'+str(x[1]) for x in self.key_value])+"}"
+        return "{"+",".join([str(key)+':'+str(value) for key,value in self.entries.items()])+"}"
 
 class BaseFunction(Value):
+    __slots__=("start","end","context","name","layout")
+
     def __init__(self,name):
         super().__init__()
         self.name=name or "<anonymous>"
+        self.layout=None
 
     def generate_new_context(self):
         new_context=Context(self.name,self.context,self.start)
-        new_context.symbol_table=SymbolTable(new_context.parent.symbol_table)
+        new_context.symbol_table=SymbolTable(new_context.parent.symbol_table,self.layout)
         return new_context
 
     def check_args(self,arg_names,args):
@@ -1598,28 +2836,50 @@ class BaseFunction(Value):
         return res.success(None)
 
 class Function(BaseFunction):
-    def __init__(self,name,body_node,arg_names,return_null):
+    __slots__=("body_node","arg_names","return_null")
+
+    def __init__(self,name,body_node,arg_names,return_null,layout=None):
         super().__init__(name)
         self.body_node=body_node
         self.arg_names=arg_names
         self.return_null=return_null
+        self.layout=layout
 
     def execute(self, args):
         res=RunTimeResult()
-        interpreter=Interpreter()
-        exec_ctx=self.generate_new_context()
-
-        res.register(self.check_and_populate_args(self.arg_names,args,exec_ctx))
-        if res.error:
-            return res
+        try:
+            return res.success(self.call(args))
+        except RunTimeException as exception:
+            return res.failure(exception.error)
 
-        value=res.register(interpreter.visit(self.body_node,exec_ctx))
-        if res.error:
-            return res
-        return res.success(Number.null if self.return_null else value)
+    def call(self,args):
+        exec_ctx=self.generate_new_context()
+        error=self.check_and_populate_args(self.arg_names,args,exec_ctx).error
+        if error:
+            raise RunTimeException(error)
+        depth=exec_ctx.depth
+        if depth>exec_ctx.max_depth:
+            raise RunTimeException(recursion_error(self.start,self.end,self.context))
+        function=self
+        try:
+            while True:
+                if function.return_null:
+                    Interpreter().visit(function.body_node,exec_ctx)
+                    return Number.null
+                value=Interpreter().visit_tail(function.body_node,exec_ctx)
+                if type(value) is not TailCall:
+                    return value
+                function=value.function
+                exec_ctx=function.generate_new_context()
+                exec_ctx.depth=depth
+                error=function.check_and_populate_args(function.arg_names,value.args,exec_ctx).error
+                if error:
+                    raise RunTimeException(error)
+        except RecursionError:
+            raise RunTimeException(recursion_error(function.start,function.end,function.context)) from None
 
     def copy(self):
-        copy=Function(self.name,self.body_node,self.arg_names,self.return_null)
+        copy=Function(self.name,self.body_node,self.arg_names,self.return_null,self.layout)
         copy.set_context(self.context)
         copy.set_pos(self.start,self.end)
         return copy
@@ -1627,52 +2887,90 @@ class Function(BaseFunction):
     def __repr__(self):
         return f"<function>{self.name}"
 
+#Built-in Registry
+builtin_functions={}
+builtin_effects={}
+
+def builtin(global_name,*arg_names,effect=None):
+    def register(method):
+        method.arg_names=list(arg_names)
+        builtin_functions[global_name]=method.__name__[len("execute_"):]
+        if effect:
+            builtin_effects[global_name]=effect
+        return method
+    return register
+
+class BuiltInException(Exception):
+    def __init__(self,details):
+        super().__init__(details)
+        self.details=details
+
 class BuiltInFunction(BaseFunction):
+    __slots__=("method",)
+
+    immutable=True
+
     def __init__(self, name):
         super().__init__(name)
+        self.method=getattr(self,f'execute_{self.name}',None)
+        if self.method is None:
+            self.no_visit_method()
 
     def execute(self,args):
         res=RunTimeResult()
-        exec_ctx=self.generate_new_context()
-
-        method_name=f'execute_{self.name}'
-        method=getattr(self,method_name,self.no_visit_method)
-
-        res.register(self.check_and_populate_args(method.arg_names,args,exec_ctx))
-        if res.error:
-            return res
+        try:
+            return res.success(self.invoke(args,self.start,self.end,self.context))
+        except RunTimeException as exception:
+            return res.failure(exception.error)
+
+    def invoke(self,args,start,end,context):
+        method=self.method
+        if len(args)!=len(method.arg_names):
+            function=self.located(start,end,context)
+            raise RunTimeException(function.check_args(method.arg_names,args).error)
+        try:
+            return method(context,*args)
+        except BuiltInException as exception:
+            exec_ctx=Context(self.name,context,start)
+            raise RunTimeException(RunTimeError(start,end,exception.details,exec_ctx))
 
-        return_value=res.register(method(exec_ctx))
-        if res.error:
-            return res
+    def no_visit_method(self):
+        raise Exception(f'No execute_{self.name} method defined')
 
-        return res.success(return_value)
+    def set_pos(self,start=None,end=None):
+        return self
 
-    def no_visit_method(self,node,context):
-        raise Exception(f'No execute_{self.name} method defined')
+    def set_context(self,context=None):
+        return self
 
     def copy(self):
-        copy=BuiltInFunction(self.name)
-        copy.set_context(self.context)
-        copy.set_pos(self.start,self.end)
-        return copy
+        return self
+
+    def located(self,start,end,context):
+        function=object.__new__(BuiltInFunction)
+        function.name=self.name
+        function.layout=None
+        function.method=self.method
+        function.start=start
+        function.end=end
+        function.context=context
+        return function
 
     def __repr__(self):
         return f"<built-in function{self.name}>"
 
-    def execute_print(self,exec_ctx):
-        print(str(exec_ctx.symbol_table.get("value")))
-        return RunTimeResult().success(Number.null)
+    @builtin("Print","value",effect="io")
+    def execute_print(self,context,value):
+        print(str(value))
+        return Number.null
 
-    execute_print.arg_names=["value"]
-
-    def execute_input(self,exec_ctx):
+    @builtin("Input",effect="io")
+    def execute_input(self,context):
         text=input()
-        return RunTimeResult().success(String(text))
-
-    execute_input.arg_names=[]
+        return String(text)
 
-    def execute_input_int(self,exec_ctx):
+    @builtin("Input_Int",effect="io")
+    def execute_input_int(self,context):
         while True:
             text=input()
             try:
@@ -1680,117 +2978,416 @@ class BuiltInFunction(BaseFunction):
                 break
             except ValueError:
                 print(f"'{text}' must be an integer")
-        return RunTimeResult().success(Number(number))
+        return Number(number)
 
-    execute_input_int.arg_names=[]
+    @builtin("Is_number","value")
+    def execute_is_number(self,context,value):
+        return Number.true if isinstance(value,Number) else Number.false
 
-    def execute_is_number(self,exec_ctx):
-        is_number=isinstance(exec_ctx.symbol_table.get("value"),Number)
-        return RunTimeResult().success(Number.true if is_number else Number.false)
+    @builtin("Is_string","value")
+    def execute_is_string(self,context,value):
+        return Number.true if isinstance(value,String) else Number.false
 
-    execute_is_number.arg_names=["value"]
+    @builtin("Is_list","value")
+    def execute_is_list(self,context,value):
+        return Number.true if isinstance(value,List) else Number.false
 
-    def execute_is_string(self,exec_ctx):
-        is_number=isinstance(exec_ctx.symbol_table.get("value"),String)
-        return RunTimeResult().success(Number.true if is_number else Number.false)
+    @builtin("Append","list","value",effect="write")
+    def execute_append(self,context,list_,value):
+        if not isinstance(list_,List):
+            raise BuiltInException("First argument must be a list")
 
-    execute_is_string.arg_names=["value"]
+        list_.elements.append(value)
+        return Number.null
 
-    def execute_is_list(self,exec_ctx):
-        is_list=isinstance(exec_ctx.symbol_table.get("value"),List)
-        return RunTimeResult().success(Number.true if is_list else Number.false)
+    @builtin("Pop","list","index",effect="write")
+    def execute_pop(self,context,list_,index):
+        if not isinstance(list_,List):
+            raise BuiltInException("First argument must be a list")
 
-    execute_is_list.arg_names=["value"]
+        if not isinstance(index,Number):
+            raise BuiltInException("Second argument must be an integer")
 
-    def execute_append(self,exec_ctx):
-        list_=exec_ctx.symbol_table.get("list")
-        value=exec_ctx.symbol_table.get("value")
+        try:
+            position=index.value
+            if position>0:
+                position-=1
+            return list_.elements.pop(position)
+        except:
+            raise BuiltInException("List index out of range")
 
-        if not isinstance(list_,List):
-            return RunTimeResult().failure(RunTimeError(self.start,self.end,
-            "First argument must be a list",exec_ctx))
+    @builtin("Extend","listA","listB",effect="write")
+    def execute_extend(self,context,listA,listB):
+        if not isinstance(listA,List):
+            raise BuiltInException("First argument must be a list")
 
-        list_.elements.append(value)
-        return RunTimeResult().success(Number.null)
-    execute_append.arg_names=["list","value"]
+        if not isinstance(listB,List):
+            raise BuiltInException("Second argument must be a list")
+
+        listA.elements.extend(listB.elements)
+        return Number.null
+
+    @builtin("Insert","dictionary","key","value",effect="write")
+    def execute_insert(self,context,dictionary,key,value):
+        if not isinstance(dictionary,Dictionary):
+            raise BuiltInException("First argument must be a dictionary")
+
+        if key in dictionary.entries:
+            raise BuiltInException("Key already exists in dictionary")
+
+        dictionary.entries[key]=value
+        return Number.null
+
+    @builtin("Update","dictionary","key","value",effect="write")
+    def execute_update(self,context,dictionary,key,value):
+        if not isinstance(dictionary,Dictionary):
+            raise BuiltInException("First argument must be a dictionary")
+
+        if key not in dictionary.entries:
+            raise BuiltInException("Key not found in dictionary")
+
+        dictionary.entries[key]=value
+        return Number.null
+
+    @builtin("Delete","dictionary","key",effect="write")
+    def execute_delete(self,context,dictionary,key):
+        if not isinstance(dictionary,Dictionary):
+            raise BuiltInException("First argument must be a dictionary")
+
+        if key not in dictionary.entries:
+            raise BuiltInException("Key not found in dictionary")
+
+        return dictionary.entries.pop(key)
+
+    @builtin("Has_key","dictionary","key")
+    def execute_has_key(self,context,dictionary,key):
+        if not isinstance(dictionary,Dictionary):
+            raise BuiltInException("First argument must be a dictionary")
+
+        return Number.true if key in dictionary.entries else Number.false
+
+    @builtin("Keys","dictionary")
+    def execute_keys(self,context,dictionary):
+        if not isinstance(dictionary,Dictionary):
+            raise BuiltInException("First argument must be a dictionary")
+
+        return List(list(dictionary.entries)).set_context(context)
+
+    @builtin("Values","dictionary")
+    def execute_values(self,context,dictionary):
+        if not isinstance(dictionary,Dictionary):
+            raise BuiltInException("First argument must be a dictionary")
 
-    def execute_pop(self,exec_ctx):
-        list_=exec_ctx.symbol_table.get("list")
-        index=exec_ctx.symbol_table.get("index")
+        return List(pack_numbers(list(dictionary.entries.values()))).set_context(context)
 
+    def numbers(self,list_):
         if not isinstance(list_,List):
-            return RunTimeResult().failure(RunTimeError(self.start,self.end,
-            "First argument must be a list",exec_ctx))
+            raise BuiltInException("Argument must be a list")
+
+        values=number_values(list_.elements)
+        if values is None:
+            raise BuiltInException("List must contain only numbers")
+        return values
+
+    @builtin("Sum","list")
+    def execute_sum(self,context,list_):
+        return Number(sum(self.numbers(list_)))
+
+    @builtin("Min","list")
+    def execute_min(self,context,list_):
+        values=self.numbers(list_)
+        if not values:
+            raise BuiltInException("List must not be empty")
+        return Number(min(values))
+
+    @builtin("Max","list")
+    def execute_max(self,context,list_):
+        values=self.numbers(list_)
+        if not values:
+            raise BuiltInException("List must not be empty")
+        return Number(max(values))
+
+    @builtin("Mean","list")
+    def execute_mean(self,context,list_):
+        values=self.numbers(list_)
+        if not values:
+            raise BuiltInException("List must not be empty")
+        return Number(sum(values)/len(values))
+
+    @builtin("Dot","listA","listB")
+    def execute_dot(self,context,listA,listB):
+        valuesA=self.numbers(listA)
+        valuesB=self.numbers(listB)
+        if len(valuesA)!=len(valuesB):
+            raise BuiltInException("Lists must have the same length")
+        return Number(sum(map(operator.mul,valuesA,valuesB)))
+
+    def elementwise(self,context,list_,other,function):
+        values=self.numbers(list_)
 
-        if not isinstance(index,Number):
-            return RunTimeResult().failure(RunTimeError(self.start,self.end,
-            "Second argument must be an integer",exec_ctx))
+        if isinstance(other,Number):
+            others=[other.value]*len(values)
+        elif isinstance(other,List):
+            others=self.numbers(other)
+            if len(values)!=len(others):
+                raise BuiltInException("Lists must have the same length")
+        else:
+            raise BuiltInException("Second argument must be a number or a list")
 
         try:
-            if index.value>0:
-                index.value-=1
-            element=list_.elements.pop(index.value)
-        except:
-            return RunTimeResult().failure(RuntimeError(self.start,self.end,"List index out of range",exec_ctx))
-        return RunTimeResult().success(element)
+            results=list(map(function,values,others))
+        except ZeroDivisionError:
+            raise BuiltInException("Division By Zero")
+        return List(pack_values(results)).set_context(context)
 
-    execute_pop.arg_names=["list","index"]
+    @builtin("Vector_add","list","other")
+    def execute_vector_add(self,context,list_,other):
+        return self.elementwise(context,list_,other,operator.add)
 
-    def execute_extend(self,exec_ctx):
-        listA=exec_ctx.symbol_table.get("listA")
-        listB=exec_ctx.symbol_table.get("listB")
+    @builtin("Vector_subtract","list","other")
+    def execute_vector_subtract(self,context,list_,other):
+        return self.elementwise(context,list_,other,operator.sub)
 
-        if not isinstance(listA,List):
-            return RunTimeResult().failure(RunTimeError(self.start,self.end,
-            "First argument must be a list",exec_ctx))
+    @builtin("Vector_multiply","list","other")
+    def execute_vector_multiply(self,context,list_,other):
+        return self.elementwise(context,list_,other,operator.mul)
 
-        if not isinstance(listB,List):
-            return RunTimeResult().failure(RunTimeError(self.start,self.end,
-            "Second argument must be a list",exec_ctx))
+    @builtin("Vector_divide","list","other")
+    def execute_vector_divide(self,context,list_,other):
+        return self.elementwise(context,list_,other,operator.truediv)
 
-        listA.elements.extend(listB.elements)
-        return RunTimeResult().success(Number.null)
-
-    execute_extend.arg_names=["listA","listB"]
-
-BuiltInFunction.print=BuiltInFunction("print")
-BuiltInFunction.input=BuiltInFunction("input")
-BuiltInFunction.input_int=BuiltInFunction("input_int")
-BuiltInFunction.is_number=BuiltInFunction("is_number")
-BuiltInFunction.is_string=BuiltInFunction("is_string")
-BuiltInFunction.is_list=BuiltInFunction("is_list")
-BuiltInFunction.append=BuiltInFunction("append")
-BuiltInFunction.pop=BuiltInFunction("pop")
-BuiltInFunction.extend=BuiltInFunction("extend")
+for name in builtin_functions.values():
+    setattr(BuiltInFunction,name,BuiltInFunction(name))
     
 #Context Class
+#Calls may nest this deep by default on every engine. run() takes a different limit as max_depth.
+MAX_CALL_DEPTH=100000
+
 class Context:
+    __slots__=("display_name","parent","parent_pos","symbol_table","cache","depth","max_depth")
+
     def __init__(self,display_name,parent=None,parent_pos=None):
         self.display_name=display_name
         self.parent=parent
         self.parent_pos=parent_pos
         self.symbol_table=None
+        self.cache=None
+        if parent is None:
+            self.depth=0
+            self.max_depth=MAX_CALL_DEPTH
+        else:
+            self.depth=parent.depth+1
+            self.max_depth=parent.max_depth
+
+def recursion_error(start,end,context):
+    return RunTimeError(start,end,"Maximum recursion depth exceeded",context)
 
 #SymbolTable
 class SymbolTable:
-    def __init__(self,parent=None):
-        self.symbols={}
+    __slots__=("parent","globals","shared","layout","slots","symbols")
+
+    def __init__(self,parent=None,layout=None):
         self.parent=parent
-    
+        self.globals=parent.globals if parent else self
+        self.shared=layout is not None
+        if self.shared:
+            self.layout=layout
+            self.slots=[None]*len(layout)
+        else:
+            self.layout={}
+            self.slots=[]
+        self.symbols=None
+
+    def declare(self,name):
+        slot=self.layout.get(name)
+        if slot is None:
+            slot=self.layout[name]=len(self.slots)
+            self.slots.append(None)
+        return slot
+
     def get(self,name):
-        value=self.symbols.get(name,None)
-        if value==None and self.parent:
-            return self.parent.get(name)
-        return value
+        table=self
+        while table is not None:
+            slot=table.layout.get(name)
+            if slot is not None:
+                value=table.slots[slot]
+                if value is not None:
+                    return value
+            elif table.symbols:
+                value=table.symbols.get(name)
+                if value is not None:
+                    return value
+            table=table.parent
+        return None
+
+    def lookup(self,name,address):
+        if address is None:
+            return self.get(name)
+        depth,slot=address
+        if depth==0:
+            value=self.slots[slot]
+            if value is None and self.parent is not None:
+                return self.parent.get(name)
+            return value
+        if name in frame_names:
+            return self.get(name)
+        return self.globals.slots[slot]
 
     def set(self,name,value):
-        self.symbols[name]=value
+        slot=self.layout.get(name)
+        if slot is not None:
+            self.slots[slot]=value
+            return
+        if self.parent is not None:
+            frame_names.add(name)
+        if self.shared:
+            if self.symbols is None:
+                self.symbols={}
+            self.symbols[name]=value
+        else:
+            self.slots[self.declare(name)]=value
+
+    def assign(self,name,address,value):
+        if address is None:
+            self.set(name,value)
+        else:
+            self.slots[address[1]]=value
 
     def remove(self,name):
-        del self.symbols[name]
+        slot=self.layout.get(name)
+        if slot is not None:
+            self.slots[slot]=None
+        else:
+            del self.symbols[name]
+
+#Loop Ranges
+def loop_values(start,end,step):
+    if type(start) is int and type(end) is int and type(step) is int and step!=0:
+        return range(start,end+1,step) if step>0 else range(start,end-1,step)
+    return stepped_values(start,end,step)
+
+#Float ranges count their steps up front and compute each value from its index, so rounding error
+#neither accumulates across iterations nor gains or loses an iteration at the end of the range
+LOOP_TOLERANCE=1e-9
+LOOP_BOUNDS=("start_value_node","end_value_node","step_value_node")
+
+def stepped_values(start,end,step):
+    count=(end-start)/step+LOOP_TOLERANCE
+    if count>=0:
+        yield start
+        for index in range(1,int(count)+1):
+            yield start+index*step
+
+#Bounds that are not numbers and a zero step are reported at the offending bound before the loop starts
+def loop_error(node,start_value,end_value,step_value,context):
+    for bound_node,value in ((node.start_value_node,start_value),(node.end_value_node,end_value),(node.step_value_node,step_value)):
+        if not isinstance(value,Number):
+            start,end=value_position(bound_node)
+            return RunTimeError(start,end,"Loop bounds must be numbers",context)
+    if step_value.value==0:
+        start,end=value_position(node.step_value_node)
+        return RunTimeError(start,end,"Step must not be zero",context)
+    return None
+
+#Quickening
+#A BinaryOpnode starts out generic. After its first successful evaluation the interpreter installs a
+#fast path for the operand types it saw, and drops back to the generic path for good on a mismatch.
+#Both numeric fast paths accept any mix of int and float operands; they differ only in which result
+#they build without going through Number's small int cache.
+QUICK_DIVISIONS={"divide":operator.truediv,"floor_divide":operator.floordiv,"modulo":operator.mod}
+QUICK_STRING_OPERATIONS=frozenset(("add","multiply","index"))
+quick_operations={}
+
+def quicken(method_name,left,right,result):
+    if method_name in SHORT_CIRCUIT:
+        return False
+    if type(left) is Number and type(right) is Number:
+        variant=float_operation if type(result.value) is float else number_operation
+    elif isinstance(left,String) and method_name in QUICK_STRING_OPERATIONS:
+        variant=string_operation
+    else:
+        return False
+    key=(variant,method_name)
+    if key not in quick_operations:
+        quick_operations[key]=variant(method_name)
+    return quick_operations[key]
+
+def number_function(method_name):
+    if method_name in QUICK_DIVISIONS:
+        return QUICK_DIVISIONS[method_name],False
+    return NUMBER_OPERATIONS[method_name]
+
+def number_operation(method_name):
+    fast,comparison=number_function(method_name)
+    number=Number
+
+    if comparison:
+        truth=(Number.false,Number.true)
+        def compare(left,right):
+            if type(left) is number and type(right) is number:
+                return truth[fast(left.value,right.value)]
+            return None
+        return compare
+
+    if method_name in QUICK_DIVISIONS:
+        def divide(left,right):
+            if type(left) is number and type(right) is number and right.value!=0:
+                return number(fast(left.value,right.value))
+            return None
+        return divide
+
+    def arithmetic(left,right):
+        if type(left) is number and type(right) is number:
+            return number(fast(left.value,right.value))
+        return None
+    return arithmetic
+
+def float_operation(method_name):
+    fast,comparison=number_function(method_name)
+    number=Number
+    new=object.__new__
+    divides=method_name in QUICK_DIVISIONS
+
+    def arithmetic(left,right):
+        if type(left) is number and type(right) is number and not (divides and right.value==0):
+            value=fast(left.value,right.value)
+            if type(value) is float:
+                result=new(number)
+                result.value=value
+                return result
+            return number(value)
+        return None
+    return arithmetic
+
+def string_operation(method_name):
+    string=String
+
+    if method_name=="add":
+        def concatenate(left,right):
+            if isinstance(left,string) and isinstance(right,string):
+                return left.add(right)[0]
+            return None
+        return concatenate
+
+    number=Number
+    method=getattr(String,method_name)
+    def sequence(left,right):
+        if isinstance(left,string) and type(right) is number:
+            return method(left,right)[0]
+        return None
+    return sequence
 
 #Interpreter Class
 class Interpreter():
+    def execute(self,node,context):
+        res=RunTimeResult()
+        try:
+            return res.success(self.visit(node,context))
+        except RunTimeException as exception:
+            return res.failure(exception.error)
+        except RecursionError:
+            return res.failure(recursion_error(node.start,node.end,context))
+
     def visit(self,node,context):
         method_name=f'visit_{type(node).__name__}'
         method=getattr(self,method_name,self.no_visit_method)
@@ -1800,269 +3397,2218 @@ class Interpreter():
         raise Exception(f'No visit_{type(node).__name__} method defined')
 
     def visit_NumberNode(self,node,context):
-        return RunTimeResult().success(Number(node.tok.value).set_context(context).set_pos(node.start,node.end))
+        if node.constant is None:
+            node.constant=Number(node.tok.value)
+        return node.constant
 
     def visit_VarAccessNode(self,node,context):
-        res=RunTimeResult()
         var_name=node.var_name_tok.value
-        value=context.symbol_table.get(var_name)
+        value=context.symbol_table.lookup(var_name,node.address)
 
         if not value:
-            return res.failure(RunTimeError(node.start,node.end,f"'{var_name}' is not defined",context))
+            raise RunTimeException(RunTimeError(node.start,node.end,f"'{var_name}' is not defined",context))
 
-        value=value.copy().set_pos(node.start,node.end).set_context(context)
-        return res.success(value)
+        if not value.immutable:
+            value=value.copy().set_pos(node.start,node.end).set_context(context)
+        return value
 
     def visit_VarAssignNode(self,node,context):
-        res=RunTimeResult()
         var_name=node.var_name_tok.value
-        value=res.register(self.visit(node.value_node,context))
-        if res.error:
-            return res
-        context.symbol_table.set(var_name,value)
-        return res.success(value)
+        value=self.visit(node.value_node,context)
+        context.symbol_table.assign(var_name,node.address,value)
+        return value
 
     def visit_BinaryOpnode(self,node,context):
-        res=RunTimeResult()
-        left=res.register(self.visit(node.left_node,context))
-        if res.error:
-            return res
-        right=res.register(self.visit(node.right_node,context))
-        if res.error:
-            return res
-
-        if node.operator.type==T_PLUS:
-            result,error=left.add(right)
-        elif node.operator.type==T_MINUS:
-            result,error=left.subtract(right)
-        elif node.operator.type==T_MULTIPLY:
-            result,error=left.multiply(right)
-        elif node.operator.type==T_DIVIDE:
-            result,error=left.divide(right)
-        elif node.operator.type==T_FLOORDIVIDE:
-            result,error=left.floor_divide(right)
-        elif node.operator.type==T_MODULO:
-            result,error=left.modulo(right)
-        elif node.operator.type==T_INDEX:
-            result,error=left.index(right)
-        elif node.operator.type==T_POWER:
-            result,error=left.power(right)
-        elif node.operator.type==T_EE:
-            result,error=left.comparison_equal(right)
-        elif node.operator.type==T_NE:
-            result,error=left.comparison_notequal(right)
-        elif node.operator.type==T_LT:
-            result,error=left.comparison_lessthan(right)
-        elif node.operator.type==T_LTE:
-            result,error=left.comparison_lessthanequal(right)
-        elif node.operator.type==T_GT:
-            result,error=left.comparison_greaterthan(right)
-        elif node.operator.type==T_GTE:
-            result,error=left.comparison_greaterthanequal(right)
-        elif node.operator.matches(T_KEYWORD,"and"):
-            result,error=left.andop(right)
-        elif node.operator.matches(T_KEYWORD,"or"):
-            result,error=left.orop(right)
+        quick=node.quick
+        if quick:
+            left=self.visit(node.left_node,context)
+            right=self.visit(node.right_node,context)
+            result=quick(left,right)
+            if result is not None:
+                return result
+            node.quick=False
+            return self.binary_result(node,node.method_name,left,right,context)
+
+        method_name=node.method_name
+        left=self.visit(node.left_node,context)
+        if method_name in SHORT_CIRCUIT and isinstance(left,Number) and left.is_true()==SHORT_CIRCUIT[method_name]:
+            return Number(int(left.value))
+        right=self.visit(node.right_node,context)
+
+        result=self.binary_result(node,method_name,left,right,context)
+        if quick is None:
+            node.quick=quicken(method_name,left,right,result)
+        return result
+
+    def binary_result(self,node,method_name,left,right,context):
+        result,error=getattr(left,method_name)(right)
         if error:
-            return res.failure(error)
-        else:
-            return res.success(result.set_pos(node.start,node.end))
+            raise RunTimeException(binary_error(node,method_name,left,right,context))
+        return result.set_pos(node.start,node.end)
 
     def visit_UnaryOpnode(self,node,context):
-        res=RunTimeResult()
-        number=res.register(self.visit(node.node,context))
-        if res.error:
-            return res
+        number=self.visit(node.node,context)
         error=None
         if node.operator.type==T_MINUS:
-            number,error=number.multiply(Number(-1))
+            result,error=number.multiply(Number(-1))
+            method_name="multiply"
         elif node.operator.matches(T_KEYWORD,"not"):
-            number,error=number.notop()
-        if error:
-            return res.failure(error)
+            result,error=number.notop()
+            method_name="notop"
         else:
-            return res.success(number.set_pos(node.start,node.end))
+            result=number
+        if error:
+            raise RunTimeException(unary_error(node,method_name,number,context))
+        return result.set_pos(node.start,node.end)
 
     def visit_StringNode(self,node,context):
-        return RunTimeResult().success(String(node.tok.value).set_context(context).set_pos(node.start,node.end))
+        if node.constant is None:
+            node.constant=String(node.tok.value)
+        return node.constant
 
     def visit_ListNode(self,node,context):
-        res=RunTimeResult()
-        elements=[]
-
-        for element_node in node.element_nodes:
-            elements.append(res.register(self.visit(element_node,context)))
-            if res.error:
-                return res
-        return res.success(List(elements).set_context(context).set_pos(node.start,node.end))
+        if node.discard:
+            for element_node in node.element_nodes:
+                self.visit(element_node,context)
+            return Number.null
+        elements=[self.visit(element_node,context) for element_node in node.element_nodes]
+        return List(pack_numbers(elements)).set_context(context).set_pos(node.start,node.end)
 
     def visit_DictionaryNode(self,node,context):
-        res=RunTimeResult()
-        key=[]
-        value=[]
-
-        for key_node in node.key_nodes:
-            key.append(res.register(self.visit(key_node,context)))
-            if res.error:
-                return res
-        
-        for value_node in node.value_nodes:
-            value.append(res.register(self.visit(value_node,context)))
-            if res.error:
-                return res
-
-        return res.success(Dictionary(key,value).set_context(context).set_pos(node.start,node.end))
+        key=[self.visit(key_node,context) for key_node in node.key_nodes]
+        value=[self.visit(value_node,context) for value_node in node.value_nodes]
+        return Dictionary(dict(zip(key,value))).set_context(context).set_pos(node.start,node.end)
 
     def visit_IfNode(self,node,context):
-        res=RunTimeResult()
-
         for condition,expression,return_null in node.cases:
-            condition_value=res.register(self.visit(condition,context))
-            if res.error:
-                return res
-            if condition_value.is_true():
-                expression_value=res.register(self.visit(expression,context))
-                if res.error:
-                    return res
-                return res.success(Number.null if return_null else expression_value)
-        
+            if self.visit(condition,context).is_true():
+                expression_value=self.visit(expression,context)
+                return Number.null if return_null else expression_value
+
         if node.else_case:
             expression,return_null=node.else_case
-            else_value=res.register(self.visit(expression,context))
-            if res.error:
-                return res
-            return res.success(Number.null if return_null else else_value)
+            else_value=self.visit(expression,context)
+            return Number.null if return_null else else_value
 
-        return res.success(Number.null)
+        return Number.null
 
     def visit_ForNode(self,node,context):
-        res=RunTimeResult()
-        elements=[]
-
-        start_value=res.register(self.visit(node.start_value_node,context))
-        if res.error:
-            return res
-
-        end_value=res.register(self.visit(node.end_value_node,context))
-        if res.error:
-            return res
-        
+        start_value=self.visit(node.start_value_node,context)
+        end_value=self.visit(node.end_value_node,context)
         if node.step_value_node:
-            step_value=res.register(self.visit(node.step_value_node,context))
-            if res.error:
-                return res
+            step_value=self.visit(node.step_value_node,context)
         else:
             step_value=Number(1)
-        
-        i=start_value.value
-
-        if step_value.value>=0:
-            condition=lambda:i<=end_value.value
-        else:
-            condition=lambda:i>=end_value.value
 
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value,Number(i))
-            i+=step_value.value
+        error=loop_error(node,start_value,end_value,step_value,context)
+        if error:
+            raise RunTimeException(error)
+        values=map(Number,loop_values(start_value.value,end_value.value,step_value.value))
+        symbol_table=context.symbol_table
+        var_name=node.var_name_tok.value
+        address=node.address
+        body_node=node.body_node
+        visit=getattr(self,f'visit_{type(body_node).__name__}',self.no_visit_method)
 
-            elements.append(res.register(self.visit(node.body_node,context)))
-            if res.error:
-                return res
+        if node.return_null:
+            for value in values:
+                symbol_table.assign(var_name,address,value)
+                visit(body_node,context)
+            return Number.null
 
-        return res.success(Number.null if node.return_null else List(elements).set_context(context).set_pos(node.start,node.end))
+        elements=[]
+        for value in values:
+            symbol_table.assign(var_name,address,value)
+            elements.append(visit(body_node,context))
+        return List(pack_numbers(elements)).set_context(context).set_pos(node.start,node.end)
 
     def visit_WhileNode(self,node,context):
-        res=RunTimeResult()
-        elements=[]
+        condition_node=node.condition_node
+        body_node=node.body_node
 
-        while True:
-            condition=res.register(self.visit(node.condition_node,context))
-            if res.error:
-                return res
-            
-            if not condition.is_true():
-                break
+        if node.return_null:
+            while self.visit(condition_node,context).is_true():
+                self.visit(body_node,context)
+            return Number.null
 
-            elements.append(res.register(self.visit(node.body_node,context)))
-            if res.error:
-                return res
-                
-        return res.success(Number.null if node.return_null else List(elements).set_context(context).set_pos(node.start,node.end))
+        elements=[]
+        while self.visit(condition_node,context).is_true():
+            elements.append(self.visit(body_node,context))
+        return List(pack_numbers(elements)).set_context(context).set_pos(node.start,node.end)
+
+    def visit_CacheScopeNode(self,node,context):
+        enter_cache_scope(node,context)
+        return self.visit(node.node,context)
+
+    def visit_CachedNode(self,node,context):
+        cache=context.cache
+        value=cache[node.slot]
+        if value is None:
+            value=self.visit(node.node,context)
+            if value.immutable:
+                cache[node.slot]=value
+        elif value is False:
+            value=self.visit(node.node,context)
+        return value
 
     def visit_FuncDefNode(self,node,context):
-        res=RunTimeResult()
         if node.var_name_tok:
             func_name=node.var_name_tok.value
         else:
             func_name=None
         body_node=node.body_node
         arg_names=[arg_name.value for arg_name in node.arg_name_toks]
-        func_value=Function(func_name,body_node,arg_names,node.return_null).set_context(context).set_pos(node.start,node.end)
+        func_value=Function(func_name,body_node,arg_names,node.return_null,node.layout).set_context(context).set_pos(node.start,node.end)
 
         if node.var_name_tok:
-            context.symbol_table.set(func_name,func_value)
+            context.symbol_table.assign(func_name,node.address,func_value)
 
-        return res.success(func_value)
+        return func_value
 
     def visit_CallNode(self,node,context):
+        value_to_call,args=self.call_target(node,context)
+        if type(value_to_call) is Function:
+            return self.call_result(value_to_call.call(args),node,context)
+        if type(value_to_call) is BuiltInFunction:
+            return self.call_result(value_to_call.invoke(args,node.start,node.end,context),node,context)
+        return self.call_other(value_to_call,args,node,context)
+
+    def visit_tail(self,node,context):
+        if type(node) is CallNode:
+            value_to_call,args=self.call_target(node,context)
+            if type(value_to_call) is Function:
+                return TailCall(value_to_call,args)
+            if type(value_to_call) is BuiltInFunction:
+                return self.call_result(value_to_call.invoke(args,node.start,node.end,context),node,context)
+            return self.call_other(value_to_call,args,node,context)
+
+        if type(node) is IfNode:
+            for condition,expression,return_null in node.cases:
+                if self.visit(condition,context).is_true():
+                    if return_null:
+                        self.visit(expression,context)
+                        return Number.null
+                    return self.visit_tail(expression,context)
+
+            if node.else_case:
+                expression,return_null=node.else_case
+                if return_null:
+                    self.visit(expression,context)
+                    return Number.null
+                return self.visit_tail(expression,context)
+
+            return Number.null
+
+        return self.visit(node,context)
+
+    def call_target(self,node,context):
+        value_to_call=self.visit(node.node_to_call,context)
+        if not value_to_call.immutable:
+            value_to_call=value_to_call.copy().set_pos(node.start,node.end)
+        elif type(value_to_call) is not BuiltInFunction:
+            value_to_call=value_to_call.located(node.start,node.end,context)
+
+        args=[self.visit(arg_node,context) for arg_node in node.arg_nodes]
+        return value_to_call,args
+
+    def call_other(self,value_to_call,args,node,context):
+        res=value_to_call.execute(args)
+        if res.error:
+            raise RunTimeException(res.error)
+        return self.call_result(res.value,node,context)
+
+    def call_result(self,return_value,node,context):
+        if not return_value.immutable:
+            return_value=return_value.copy().set_pos(node.start,node.end).set_context(context)
+        return return_value
+
+#Located Errors
+def value_position(node):
+    while isinstance(node,VarAssignNode):
+        node=node.value_node
+    return node.start,node.end
+
+def locate_value(value,node,context):
+    start,end=value_position(node)
+    return value.located(start,end,context)
+
+def binary_error(node,method_name,left,right,context):
+    left=locate_value(left,node.left_node,context)
+    right=locate_value(right,node.right_node,context)
+    result,error=getattr(left,method_name)(right)
+    return error
+
+def unary_error(node,method_name,value,context):
+    value=locate_value(value,node.node,context)
+    if method_name=="multiply":
+        result,error=value.multiply(Number(-1))
+    else:
+        result,error=value.notop()
+    return error
+
+#Bytecode Opcodes
+OP_LOAD_CONST=0
+OP_LOAD_NAME=1
+OP_STORE_NAME=2
+OP_POP=3
+OP_ADD=4
+OP_SUBTRACT=5
+OP_MULTIPLY=6
+OP_LESSTHAN=7
+OP_LESSTHANEQUAL=8
+OP_GREATERTHAN=9
+OP_GREATERTHANEQUAL=10
+OP_EQUAL=11
+OP_NOTEQUAL=12
+OP_BINARY=13
+OP_NEGATE=14
+OP_NOT=15
+OP_JUMP=16
+OP_POP_JUMP_IF_FALSE=17
+OP_FOR_PREP=18
+OP_FOR_ITER=19
+OP_BUILD_ACC=20
+OP_ACC_APPEND=21
+OP_ACC_LIST=22
+OP_BUILD_LIST=23
+OP_BUILD_DICT=24
+OP_MAKE_FUNCTION=25
+OP_CALL=26
+OP_RETURN=27
+OP_LOAD_FAST=28
+OP_LOAD_GLOBAL=29
+OP_STORE_FAST=30
+OP_AND_JUMP=31
+OP_OR_JUMP=32
+OP_CACHE_SCOPE=33
+OP_CACHE_LOAD=34
+OP_CACHE_STORE=35
+
+OP_NAMES=["LOAD_CONST","LOAD_NAME","STORE_NAME","POP","ADD","SUBTRACT","MULTIPLY","LESSTHAN","LESSTHANEQUAL",
+"GREATERTHAN","GREATERTHANEQUAL","EQUAL","NOTEQUAL","BINARY","NEGATE","NOT","JUMP","POP_JUMP_IF_FALSE",
+"FOR_PREP","FOR_ITER","BUILD_ACC","ACC_APPEND","ACC_LIST","BUILD_LIST","BUILD_DICT","MAKE_FUNCTION","CALL","RETURN",
+"LOAD_FAST","LOAD_GLOBAL","STORE_FAST","AND_JUMP","OR_JUMP","CACHE_SCOPE","CACHE_LOAD","CACHE_STORE"]
+
+#Binary Operators
+BINARY_OPERATORS={
+    T_PLUS:(OP_ADD,"add"),
+    T_MINUS:(OP_SUBTRACT,"subtract"),
+    T_MULTIPLY:(OP_MULTIPLY,"multiply"),
+    T_DIVIDE:(OP_BINARY,"divide"),
+    T_FLOORDIVIDE:(OP_BINARY,"floor_divide"),
+    T_MODULO:(OP_BINARY,"modulo"),
+    T_INDEX:(OP_BINARY,"index"),
+    T_POWER:(OP_BINARY,"power"),
+    T_EE:(OP_EQUAL,"comparison_equal"),
+    T_NE:(OP_NOTEQUAL,"comparison_notequal"),
+    T_LT:(OP_LESSTHAN,"comparison_lessthan"),
+    T_LTE:(OP_LESSTHANEQUAL,"comparison_lessthanequal"),
+    T_GT:(OP_GREATERTHAN,"comparison_greaterthan"),
+    T_GTE:(OP_GREATERTHANEQUAL,"comparison_greaterthanequal"),
+    "and":(OP_BINARY,"andop"),
+    "or":(OP_BINARY,"orop"),
+}
+
+BINARY_OPCODES={method_name:op for op,method_name in BINARY_OPERATORS.values()}
+
+#Resolved once per BinaryOpnode when it is built; passes and engines read node.method_name
+def binary_method(operator):
+    return BINARY_OPERATORS[operator.value if operator.type==T_KEYWORD else operator.type][1]
+
+SHORT_CIRCUIT={"andop":False,"orop":True}
+
+#Bytecode Class
+class Bytecode:
+    def __init__(self,name):
+        self.name=name
+        self.instructions=[]
+        self.nodes=[]
+
+    def emit(self,op,arg=None,node=None):
+        self.instructions.append((op,arg))
+        self.nodes.append(node)
+        return len(self.instructions)-1
+
+    def patch(self,index,target):
+        op,arg=self.instructions[index]
+        if op==OP_FOR_ITER:
+            arg=(arg[0],target,arg[2])
+        elif op==OP_CACHE_LOAD:
+            arg=(arg[0],target)
+        else:
+            arg=target
+        self.instructions[index]=(op,arg)
+
+    def __repr__(self):
+        lines=[]
+        for index,(op,arg) in enumerate(self.instructions):
+            if isinstance(arg,FunctionTemplate):
+                arg=f'<code {arg.name}>'
+            elif isinstance(arg,CacheScopeNode):
+                arg=arg.slots
+            lines.append(f'{index:>4} {OP_NAMES[op]:<20}{"" if arg is None else arg}')
+        return f'<bytecode {self.name}>\n'+"\n".join(lines)
+
+#Function Template
+class FunctionTemplate:
+    def __init__(self,name,arg_names,code,return_null,layout=None):
+        self.name=name
+        self.arg_names=arg_names
+        self.code=code
+        self.return_null=return_null
+        self.layout=layout
+
+#Compiler Class
+class Compiler:
+    def compile(self,node,name="<program>"):
+        self.code=Bytecode(name)
+        self.visit(node)
+        self.code.emit(OP_RETURN)
+        return self.code
+
+    def visit(self,node):
+        method_name=f'visit_{type(node).__name__}'
+        method=getattr(self,method_name,self.no_visit_method)
+        return method(node)
+
+    def no_visit_method(self,node):
+        raise Exception(f'No visit_{type(node).__name__} method defined')
+
+    def discard(self,node):
+        if isinstance(node,ListNode):
+            for element_node in node.element_nodes:
+                self.discard(element_node)
+        else:
+            self.visit(node)
+            self.code.emit(OP_POP)
+
+    def visit_NumberNode(self,node):
+        self.code.emit(OP_LOAD_CONST,Number(node.tok.value),node)
+
+    def visit_StringNode(self,node):
+        self.code.emit(OP_LOAD_CONST,String(node.tok.value),node)
+
+    def visit_VarAccessNode(self,node):
+        var_name=node.var_name_tok.value
+        if node.address is None:
+            self.code.emit(OP_LOAD_NAME,var_name,node)
+        else:
+            depth,slot=node.address
+            self.code.emit(OP_LOAD_FAST if depth==0 else OP_LOAD_GLOBAL,(var_name,slot),node)
+
+    def visit_VarAssignNode(self,node):
+        self.visit(node.value_node)
+        self.emit_store(node.var_name_tok.value,node)
+
+    def emit_store(self,var_name,node):
+        if node.address is None:
+            self.code.emit(OP_STORE_NAME,var_name,node)
+        else:
+            self.code.emit(OP_STORE_FAST,node.address[1],node)
+
+    def visit_BinaryOpnode(self,node):
+        self.visit(node.left_node)
+        method_name=node.method_name
+        op=BINARY_OPCODES[method_name]
+        if method_name in SHORT_CIRCUIT:
+            jump=self.code.emit(OP_OR_JUMP if SHORT_CIRCUIT[method_name] else OP_AND_JUMP,None,node)
+            self.visit(node.right_node)
+            self.code.emit(op,method_name,node)
+            self.code.patch(jump,len(self.code.instructions))
+            return
+        self.visit(node.right_node)
+        self.code.emit(op,method_name,node)
+
+    def visit_UnaryOpnode(self,node):
+        self.visit(node.node)
+        if node.operator.type==T_MINUS:
+            self.code.emit(OP_NEGATE,None,node)
+        elif node.operator.matches(T_KEYWORD,"not"):
+            self.code.emit(OP_NOT,None,node)
+
+    def visit_ListNode(self,node):
+        if node.discard:
+            self.discard(node)
+            self.code.emit(OP_LOAD_CONST,Number.null,node)
+            return
+        for element_node in node.element_nodes:
+            self.visit(element_node)
+        self.code.emit(OP_BUILD_LIST,len(node.element_nodes),node)
+
+    def visit_DictionaryNode(self,node):
+        for key_node in node.key_nodes:
+            self.visit(key_node)
+        for value_node in node.value_nodes:
+            self.visit(value_node)
+        self.code.emit(OP_BUILD_DICT,len(node.key_nodes),node)
+
+    def visit_IfNode(self,node):
+        end_jumps=[]
+        for condition,expression,return_null in node.cases:
+            self.visit(condition)
+            next_jump=self.code.emit(OP_POP_JUMP_IF_FALSE)
+            self.visit_branch(expression,return_null)
+            end_jumps.append(self.code.emit(OP_JUMP))
+            self.code.patch(next_jump,len(self.code.instructions))
+
+        if node.else_case:
+            expression,return_null=node.else_case
+            self.visit_branch(expression,return_null)
+        else:
+            self.code.emit(OP_LOAD_CONST,Number.null)
+
+        for jump in end_jumps:
+            self.code.patch(jump,len(self.code.instructions))
+
+    def visit_branch(self,node,return_null):
+        if return_null:
+            self.discard(node)
+            self.code.emit(OP_LOAD_CONST,Number.null)
+        else:
+            self.visit(node)
+
+    def visit_ForNode(self,node):
+        self.visit(node.start_value_node)
+        self.visit(node.end_value_node)
+        if node.step_value_node:
+            self.visit(node.step_value_node)
+        else:
+            self.code.emit(OP_LOAD_CONST,Number(1))
+
+        collect=not node.return_null
+        self.code.emit(OP_FOR_PREP,collect,node)
+        loop_start=len(self.code.instructions)
+        loop_iter=self.code.emit(OP_FOR_ITER,(node.var_name_tok.value,None,node.address),node)
+        if collect:
+            self.visit(node.body_node)
+            self.code.emit(OP_ACC_APPEND,1)
+        else:
+            self.discard(node.body_node)
+        self.code.emit(OP_JUMP,loop_start)
+        self.code.patch(loop_iter,len(self.code.instructions))
+        self.emit_loop_result(node,collect)
+
+    def visit_WhileNode(self,node):
+        collect=not node.return_null
+        if collect:
+            self.code.emit(OP_BUILD_ACC)
+        loop_start=len(self.code.instructions)
+        self.visit(node.condition_node)
+        exit_jump=self.code.emit(OP_POP_JUMP_IF_FALSE)
+        if collect:
+            self.visit(node.body_node)
+            self.code.emit(OP_ACC_APPEND,0)
+        else:
+            self.discard(node.body_node)
+        self.code.emit(OP_JUMP,loop_start)
+        self.code.patch(exit_jump,len(self.code.instructions))
+        self.emit_loop_result(node,collect)
+
+    def emit_loop_result(self,node,collect):
+        if collect:
+            self.code.emit(OP_ACC_LIST,None,node)
+        else:
+            self.code.emit(OP_LOAD_CONST,Number.null)
+
+    def visit_CacheScopeNode(self,node):
+        self.code.emit(OP_CACHE_SCOPE,node,node)
+        self.visit(node.node)
+
+    def visit_CachedNode(self,node):
+        load=self.code.emit(OP_CACHE_LOAD,(node.slot,None),node)
+        self.visit(node.node)
+        self.code.emit(OP_CACHE_STORE,node.slot,node)
+        self.code.patch(load,len(self.code.instructions))
+
+    def visit_FuncDefNode(self,node):
+        func_name=node.var_name_tok.value if node.var_name_tok else None
+        arg_names=[arg_name.value for arg_name in node.arg_name_toks]
+
+        compiler=Compiler()
+        compiler.code=Bytecode(func_name or "<anonymous>")
+        compiler.visit_branch(node.body_node,node.return_null)
+        compiler.code.emit(OP_RETURN)
+
+        template=FunctionTemplate(func_name,arg_names,compiler.code,node.return_null,node.layout)
+        self.code.emit(OP_MAKE_FUNCTION,template,node)
+        if func_name:
+            self.emit_store(func_name,node)
+
+    def visit_CallNode(self,node):
+        self.visit(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.visit(arg_node)
+        self.code.emit(OP_CALL,len(node.arg_nodes),node)
+
+#Compiled Function Class
+class CompiledFunction(BaseFunction):
+    __slots__=("code","arg_names","return_null")
+
+    def __init__(self,name,code,arg_names,return_null,layout=None):
+        super().__init__(name)
+        self.code=code
+        self.arg_names=arg_names
+        self.return_null=return_null
+        self.layout=layout
+
+    def execute(self,args):
         res=RunTimeResult()
-        args=[]
+        exec_ctx=self.generate_new_context()
 
-        value_to_call=res.register(self.visit(node.node_to_call,context))
-        
+        res.register(self.check_and_populate_args(self.arg_names,args,exec_ctx))
         if res.error:
             return res
-        value_to_call=value_to_call.copy().set_pos(node.start,node.end)
+        if exec_ctx.depth>exec_ctx.max_depth:
+            return res.failure(recursion_error(self.start,self.end,self.context))
 
-        for arg_node in node.arg_nodes:
-            args.append(res.register(self.visit(arg_node,context)))
+        value=res.register(VirtualMachine().run(self.code,exec_ctx))
+        if res.error:
+            return res
+        return res.success(value)
+
+    def copy(self):
+        copy=CompiledFunction(self.name,self.code,self.arg_names,self.return_null,self.layout)
+        copy.set_context(self.context)
+        copy.set_pos(self.start,self.end)
+        return copy
+
+    def __repr__(self):
+        return f"<function>{self.name}"
+
+#Virtual Machine Class
+class VirtualMachine:
+    def run(self,code,context):
+        instructions=code.instructions
+        nodes=code.nodes
+        symbol_table=context.symbol_table
+        slots=symbol_table.slots
+        global_slots=symbol_table.globals.slots
+        stack=[]
+        push=stack.append
+        pop=stack.pop
+        frames=[]
+        number=Number
+        pc=0
+
+        while True:
+            op,arg=instructions[pc]
+            pc+=1
+
+            if op==OP_LOAD_FAST:
+                value=slots[arg[1]]
+                if value is None:
+                    if symbol_table.parent is not None:
+                        value=symbol_table.parent.get(arg[0])
+                    if value is None:
+                        node=nodes[pc-1]
+                        return RunTimeResult().failure(RunTimeError(node.start,node.end,f"'{arg[0]}' is not defined",context))
+                push(value)
+
+            elif op==OP_LOAD_GLOBAL:
+                if arg[0] in frame_names:
+                    value=symbol_table.get(arg[0])
+                else:
+                    value=global_slots[arg[1]]
+                if value is None:
+                    node=nodes[pc-1]
+                    return RunTimeResult().failure(RunTimeError(node.start,node.end,f"'{arg[0]}' is not defined",context))
+                push(value)
+
+            elif op==OP_STORE_FAST:
+                slots[arg]=stack[-1]
+
+            elif op==OP_LOAD_NAME:
+                value=symbol_table.get(arg)
+                if value is None:
+                    node=nodes[pc-1]
+                    return RunTimeResult().failure(RunTimeError(node.start,node.end,f"'{arg}' is not defined",context))
+                push(value)
+
+            elif op==OP_LOAD_CONST:
+                push(arg)
+
+            elif op==OP_POP:
+                pop()
+
+            elif op==OP_STORE_NAME:
+                symbol_table.set(arg,stack[-1])
+
+            elif op<=OP_NOTEQUAL:
+                right=pop()
+                left=stack[-1]
+                if type(left) is number and type(right) is number:
+                    if op==OP_ADD:
+                        stack[-1]=number(left.value+right.value)
+                    elif op==OP_SUBTRACT:
+                        stack[-1]=number(left.value-right.value)
+                    elif op==OP_MULTIPLY:
+                        stack[-1]=number(left.value*right.value)
+                    elif op==OP_LESSTHAN:
+                        stack[-1]=number(int(left.value<right.value))
+                    elif op==OP_LESSTHANEQUAL:
+                        stack[-1]=number(int(left.value<=right.value))
+                    elif op==OP_GREATERTHAN:
+                        stack[-1]=number(int(left.value>right.value))
+                    elif op==OP_GREATERTHANEQUAL:
+                        stack[-1]=number(int(left.value>=right.value))
+                    elif op==OP_EQUAL:
+                        stack[-1]=number(int(left.value==right.value))
+                    else:
+                        stack[-1]=number(int(left.value!=right.value))
+                else:
+                    result,error=getattr(left,arg)(right)
+                    if error:
+                        return RunTimeResult().failure(binary_error(nodes[pc-1],arg,left,right,context))
+                    stack[-1]=result
+
+            elif op==OP_POP_JUMP_IF_FALSE:
+                if not pop().is_true():
+                    pc=arg
+
+            elif op==OP_CACHE_LOAD:
+                value=context.cache[arg[0]]
+                if value is not None and value is not False:
+                    push(value)
+                    pc=arg[1]
+
+            elif op==OP_CACHE_STORE:
+                if stack[-1].immutable and context.cache[arg] is None:
+                    context.cache[arg]=stack[-1]
+
+            elif op==OP_CACHE_SCOPE:
+                enter_cache_scope(arg,context)
+
+            elif op==OP_JUMP:
+                pc=arg
+
+            elif op==OP_AND_JUMP:
+                left=stack[-1]
+                if isinstance(left,number) and not left.is_true():
+                    stack[-1]=number(int(left.value))
+                    pc=arg
+
+            elif op==OP_OR_JUMP:
+                left=stack[-1]
+                if isinstance(left,number) and left.is_true():
+                    stack[-1]=number(int(left.value))
+                    pc=arg
+
+            elif op==OP_FOR_ITER:
+                value=next(stack[-1],None)
+                if value is not None:
+                    symbol_table.assign(arg[0],arg[2],value)
+                else:
+                    pop()
+                    pc=arg[1]
+
+            elif op==OP_ACC_APPEND:
+                value=pop()
+                stack[-1-arg].append(value)
+
+            elif op==OP_CALL:
+                node=nodes[pc-1]
+                if arg:
+                    args=stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args=[]
+                value_to_call=pop()
+
+                if type(value_to_call) is CompiledFunction:
+                    exec_ctx=Context(value_to_call.name,context,node.start)
+                    exec_ctx.symbol_table=SymbolTable(symbol_table,value_to_call.layout)
+                    if len(args)!=len(value_to_call.arg_names):
+                        value_to_call=value_to_call.located(node.start,node.end,context)
+                        return value_to_call.check_args(value_to_call.arg_names,args)
+                    if exec_ctx.depth>exec_ctx.max_depth:
+                        return RunTimeResult().failure(recursion_error(node.start,node.end,context))
+                    for arg_name,arg_value in zip(value_to_call.arg_names,args):
+                        exec_ctx.symbol_table.set(arg_name,arg_value)
+                    frames.append((instructions,nodes,context,stack,pc))
+                    instructions=value_to_call.code.instructions
+                    nodes=value_to_call.code.nodes
+                    context=exec_ctx
+                    symbol_table=exec_ctx.symbol_table
+                    slots=symbol_table.slots
+                    stack=[]
+                    push=stack.append
+                    pop=stack.pop
+                    pc=0
+                elif type(value_to_call) is BuiltInFunction:
+                    try:
+                        push(value_to_call.invoke(args,node.start,node.end,context))
+                    except RunTimeException as exception:
+                        return RunTimeResult().failure(exception.error)
+                else:
+                    value_to_call=value_to_call.located(node.start,node.end,context)
+                    res=value_to_call.execute(args)
+                    if res.error:
+                        return res
+                    push(res.value)
+
+            elif op==OP_BINARY:
+                right=pop()
+                left=stack[-1]
+                result,error=getattr(left,arg)(right)
+                if error:
+                    return RunTimeResult().failure(binary_error(nodes[pc-1],arg,left,right,context))
+                stack[-1]=result
+
+            elif op==OP_BUILD_LIST:
+                if arg:
+                    elements=stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    elements=[]
+                node=nodes[pc-1]
+                push(List(pack_numbers(elements)).set_context(context).set_pos(node.start,node.end))
+
+            elif op==OP_FOR_PREP:
+                step_value=pop()
+                end_value=pop()
+                start_value=pop()
+                error=loop_error(nodes[pc-1],start_value,end_value,step_value,context)
+                if error:
+                    return RunTimeResult().failure(error)
+                if arg:
+                    push([])
+                push(map(number,loop_values(start_value.value,end_value.value,step_value.value)))
+
+            elif op==OP_BUILD_ACC:
+                push([])
+
+            elif op==OP_ACC_LIST:
+                node=nodes[pc-1]
+                stack[-1]=List(pack_numbers(stack[-1])).set_context(context).set_pos(node.start,node.end)
+
+            elif op==OP_NEGATE:
+                value,error=stack[-1].multiply(Number(-1))
+                if error:
+                    return RunTimeResult().failure(unary_error(nodes[pc-1],"multiply",stack[-1],context))
+                stack[-1]=value
+
+            elif op==OP_NOT:
+                value,error=stack[-1].notop()
+                if error:
+                    return RunTimeResult().failure(unary_error(nodes[pc-1],"notop",stack[-1],context))
+                stack[-1]=value
+
+            elif op==OP_BUILD_DICT:
+                node=nodes[pc-1]
+                value=stack[-arg:] if arg else []
+                del stack[len(stack)-arg:]
+                key=stack[-arg:] if arg else []
+                del stack[len(stack)-arg:]
+                push(Dictionary(dict(zip(key,value))).set_context(context).set_pos(node.start,node.end))
+
+            elif op==OP_MAKE_FUNCTION:
+                node=nodes[pc-1]
+                push(CompiledFunction(arg.name,arg.code,arg.arg_names,arg.return_null,arg.layout).set_context(context).set_pos(node.start,node.end))
+
+            elif op==OP_RETURN:
+                value=pop()
+                if not frames:
+                    return RunTimeResult().success(value)
+                instructions,nodes,context,stack,pc=frames.pop()
+                symbol_table=context.symbol_table
+                slots=symbol_table.slots
+                push=stack.append
+                pop=stack.pop
+                push(value)
+
+#Closure Operations
+NUMBER_OPERATIONS={
+    "add":(operator.add,False),
+    "subtract":(operator.sub,False),
+    "multiply":(operator.mul,False),
+    "power":(operator.pow,False),
+    "comparison_equal":(operator.eq,True),
+    "comparison_notequal":(operator.ne,True),
+    "comparison_lessthan":(operator.lt,True),
+    "comparison_lessthanequal":(operator.le,True),
+    "comparison_greaterthan":(operator.gt,True),
+    "comparison_greaterthanequal":(operator.ge,True),
+}
+
+#Closure Compiler Class
+class ClosureCompiler:
+    def compile(self,node):
+        return self.visit(node)
+
+    def visit(self,node):
+        method_name=f'visit_{type(node).__name__}'
+        method=getattr(self,method_name,self.no_visit_method)
+        return method(node)
+
+    def no_visit_method(self,node):
+        raise Exception(f'No visit_{type(node).__name__} method defined')
+
+    def discard(self,node):
+        if isinstance(node,ListNode):
+            statements=[self.discard(element_node) for element_node in node.element_nodes]
+            def run_statements(context):
+                for statement in statements:
+                    statement(context)
+            return run_statements
+        return self.visit(node)
+
+    def branch(self,node,return_null,tail=False):
+        if not return_null:
+            return self.tail(node) if tail else self.visit(node)
+        body=self.discard(node)
+        null=Number.null
+        def run_branch(context):
+            body(context)
+            return null
+        return run_branch
+
+    def tail(self,node):
+        if type(node) is CallNode:
+            return self.visit_CallNode(node,True)
+        if type(node) is IfNode:
+            return self.visit_IfNode(node,True)
+        return self.visit(node)
+
+    def visit_NumberNode(self,node):
+        value=Number(node.tok.value)
+        return lambda context:value
+
+    def visit_StringNode(self,node):
+        value=String(node.tok.value)
+        return lambda context:value
+
+    def visit_VarAccessNode(self,node):
+        var_name=node.var_name_tok.value
+        address=node.address
+
+        def undefined(context):
+            raise RunTimeException(RunTimeError(node.start,node.end,f"'{var_name}' is not defined",context))
+
+        def var_access(context):
+            value=context.symbol_table.lookup(var_name,address)
+            if value is None:
+                undefined(context)
+            return value
+
+        if address is None:
+            return var_access
+        depth,slot=address
+
+        def local_access(context):
+            symbol_table=context.symbol_table
+            value=symbol_table.slots[slot]
+            if value is None:
+                if symbol_table.parent is not None:
+                    value=symbol_table.parent.get(var_name)
+                if value is None:
+                    undefined(context)
+            return value
+
+        def global_access(context):
+            if var_name in frame_names:
+                return var_access(context)
+            value=context.symbol_table.globals.slots[slot]
+            if value is None:
+                undefined(context)
+            return value
+
+        return local_access if depth==0 else global_access
+
+    def visit_VarAssignNode(self,node):
+        var_name=node.var_name_tok.value
+        value_node=self.visit(node.value_node)
+        if node.address is None:
+            def var_assign(context):
+                value=value_node(context)
+                context.symbol_table.set(var_name,value)
+                return value
+            return var_assign
+
+        slot=node.address[1]
+        def slot_assign(context):
+            value=value_node(context)
+            context.symbol_table.slots[slot]=value
+            return value
+        return slot_assign
+
+    def visit_BinaryOpnode(self,node):
+        left_node=self.visit(node.left_node)
+        right_node=self.visit(node.right_node)
+        method_name=node.method_name
+
+        def generic(left,right,context):
+            result,error=getattr(left,method_name)(right)
+            if error:
+                raise RunTimeException(binary_error(node,method_name,left,right,context))
+            return result
+
+        if method_name in SHORT_CIRCUIT:
+            number=Number
+            decides=SHORT_CIRCUIT[method_name]
+            def short_circuit(context):
+                left=left_node(context)
+                if isinstance(left,number) and left.is_true()==decides:
+                    return number(int(left.value))
+                return generic(left,right_node(context),context)
+            return short_circuit
+
+        if method_name not in NUMBER_OPERATIONS:
+            return lambda context:generic(left_node(context),right_node(context),context)
+
+        number=Number
+        fast,comparison=NUMBER_OPERATIONS[method_name]
+        if comparison:
+            def compare(context):
+                left=left_node(context)
+                right=right_node(context)
+                if type(left) is number and type(right) is number:
+                    return number(int(fast(left.value,right.value)))
+                return generic(left,right,context)
+            return compare
+
+        def arithmetic(context):
+            left=left_node(context)
+            right=right_node(context)
+            if type(left) is number and type(right) is number:
+                return number(fast(left.value,right.value))
+            return generic(left,right,context)
+        return arithmetic
+
+    def visit_UnaryOpnode(self,node):
+        operand=self.visit(node.node)
+        minus_one=Number(-1)
+
+        def negate(context):
+            value=operand(context)
+            result,error=value.multiply(minus_one)
+            if error:
+                raise RunTimeException(unary_error(node,"multiply",value,context))
+            return result
+
+        def notop(context):
+            value=operand(context)
+            result,error=value.notop()
+            if error:
+                raise RunTimeException(unary_error(node,"notop",value,context))
+            return result
+
+        if node.operator.type==T_MINUS:
+            return negate
+        elif node.operator.matches(T_KEYWORD,"not"):
+            return notop
+        return operand
+
+    def visit_ListNode(self,node):
+        if node.discard:
+            return self.branch(node,True)
+        element_nodes=[self.visit(element_node) for element_node in node.element_nodes]
+        def list_node(context):
+            elements=[element_node(context) for element_node in element_nodes]
+            return List(pack_numbers(elements)).set_context(context).set_pos(node.start,node.end)
+        return list_node
+
+    def visit_DictionaryNode(self,node):
+        key_nodes=[self.visit(key_node) for key_node in node.key_nodes]
+        value_nodes=[self.visit(value_node) for value_node in node.value_nodes]
+        def dictionary_node(context):
+            key=[key_node(context) for key_node in key_nodes]
+            value=[value_node(context) for value_node in value_nodes]
+            return Dictionary(dict(zip(key,value))).set_context(context).set_pos(node.start,node.end)
+        return dictionary_node
+
+    def visit_IfNode(self,node,tail=False):
+        cases=[(self.visit(condition),self.branch(expression,return_null,tail)) for condition,expression,return_null in node.cases]
+        if node.else_case:
+            expression,return_null=node.else_case
+            else_case=self.branch(expression,return_null,tail)
+        else:
+            null=Number.null
+            else_case=lambda context:null
+
+        def if_node(context):
+            for condition,expression in cases:
+                if condition(context).is_true():
+                    return expression(context)
+            return else_case(context)
+        return if_node
+
+    def visit_ForNode(self,node):
+        var_name=node.var_name_tok.value
+        start_value_node=self.visit(node.start_value_node)
+        end_value_node=self.visit(node.end_value_node)
+        if node.step_value_node:
+            step_value_node=self.visit(node.step_value_node)
+        else:
+            step=Number(1)
+            step_value_node=lambda context:step
+
+        collect=not node.return_null
+        body_node=self.visit(node.body_node) if collect else self.discard(node.body_node)
+        number=Number
+        null=Number.null
+
+        address=node.address
+
+        def for_node(context):
+            start_value=start_value_node(context)
+            end_value=end_value_node(context)
+            step_value=step_value_node(context)
+            error=loop_error(node,start_value,end_value,step_value,context)
+            if error:
+                raise RunTimeException(error)
+            values=map(number,loop_values(start_value.value,end_value.value,step_value.value))
+            symbol_table=context.symbol_table
+
+            if not collect:
+                for value in values:
+                    symbol_table.assign(var_name,address,value)
+                    body_node(context)
+                return null
+
+            elements=[]
+            for value in values:
+                symbol_table.assign(var_name,address,value)
+                elements.append(body_node(context))
+            return List(pack_numbers(elements)).set_context(context).set_pos(node.start,node.end)
+        return for_node
+
+    def visit_WhileNode(self,node):
+        condition_node=self.visit(node.condition_node)
+        collect=not node.return_null
+        body_node=self.visit(node.body_node) if collect else self.discard(node.body_node)
+        null=Number.null
+
+        def while_node(context):
+            elements=[]
+            while condition_node(context).is_true():
+                if collect:
+                    elements.append(body_node(context))
+                else:
+                    body_node(context)
+
+            if collect:
+                return List(pack_numbers(elements)).set_context(context).set_pos(node.start,node.end)
+            return null
+        return while_node
+
+    def visit_CacheScopeNode(self,node):
+        body=self.visit(node.node)
+        def cache_scope(context):
+            enter_cache_scope(node,context)
+            return body(context)
+        return cache_scope
+
+    def visit_CachedNode(self,node):
+        expression=self.visit(node.node)
+        slot=node.slot
+        def cached_node(context):
+            cache=context.cache
+            value=cache[slot]
+            if value is None:
+                value=expression(context)
+                if value.immutable:
+                    cache[slot]=value
+            elif value is False:
+                value=expression(context)
+            return value
+        return cached_node
+
+    def visit_FuncDefNode(self,node):
+        func_name=node.var_name_tok.value if node.var_name_tok else None
+        arg_names=[arg_name.value for arg_name in node.arg_name_toks]
+        body=self.branch(node.body_node,node.return_null,True)
+
+        def func_def(context):
+            func_value=ClosureFunction(func_name,body,arg_names,node.return_null,node.layout).set_context(context).set_pos(node.start,node.end)
+            if func_name:
+                context.symbol_table.assign(func_name,node.address,func_value)
+            return func_value
+        return func_def
+
+    def visit_CallNode(self,node,tail=False):
+        node_to_call=self.visit(node.node_to_call)
+        arg_nodes=[self.visit(arg_node) for arg_node in node.arg_nodes]
+
+        def call(context):
+            value_to_call=node_to_call(context)
+            args=[arg_node(context) for arg_node in arg_nodes]
+
+            if type(value_to_call) is ClosureFunction:
+                if tail:
+                    return TailCall(value_to_call,args,node,context)
+                return value_to_call.run(args,node,context)
+            if type(value_to_call) is BuiltInFunction:
+                return value_to_call.invoke(args,node.start,node.end,context)
+
+            value_to_call=value_to_call.located(node.start,node.end,context)
+            res=value_to_call.execute(args)
             if res.error:
-                return res
+                raise RunTimeException(res.error)
+            return res.value
+        return call
+
+#Closure Function Class
+class ClosureFunction(BaseFunction):
+    __slots__=("body","arg_names","return_null")
+
+    def __init__(self,name,body,arg_names,return_null,layout=None):
+        super().__init__(name)
+        self.body=body
+        self.arg_names=arg_names
+        self.return_null=return_null
+        self.layout=layout
+
+    def execute(self,args):
+        res=RunTimeResult()
+        exec_ctx=self.generate_new_context()
+
+        res.register(self.check_and_populate_args(self.arg_names,args,exec_ctx))
+        if res.error:
+            return res
+        if exec_ctx.depth>exec_ctx.max_depth:
+            return res.failure(recursion_error(self.start,self.end,self.context))
+
+        try:
+            value=self.body(exec_ctx)
+            if type(value) is TailCall:
+                value=value.function.run(value.args,value.node,value.context)
+            return res.success(value)
+        except RunTimeException as exception:
+            return res.failure(exception.error)
+
+    def run(self,args,node,context):
+        function=self
+        depth=context.depth+1
+        try:
+            while True:
+                arg_names=function.arg_names
+                if len(args)!=len(arg_names):
+                    function=function.located(node.start,node.end,context)
+                    raise RunTimeException(function.check_args(arg_names,args).error)
+                if depth>context.max_depth:
+                    raise RunTimeException(recursion_error(node.start,node.end,context))
+                exec_ctx=Context(function.name,context,node.start)
+                exec_ctx.depth=depth
+                exec_ctx.symbol_table=SymbolTable(context.symbol_table,function.layout)
+                for arg_name,arg_value in zip(arg_names,args):
+                    exec_ctx.symbol_table.set(arg_name,arg_value)
+                value=function.body(exec_ctx)
+                if type(value) is not TailCall:
+                    return value
+                function,args,node,context=value.function,value.args,value.node,value.context
+        except RecursionError:
+            raise RunTimeException(recursion_error(node.start,node.end,context)) from None
+
+    def copy(self):
+        copy=ClosureFunction(self.name,self.body,self.arg_names,self.return_null,self.layout)
+        copy.set_context(self.context)
+        copy.set_pos(self.start,self.end)
+        return copy
+
+    def __repr__(self):
+        return f"<function>{self.name}"
+
+#Scope Analysis
+class TranspileError(Exception):
+    pass
+
+class Scope:
+    def __init__(self,node=None,params=()):
+        self.node=node
+        self.params=set(params)
+        self.assigned=set()
+        self.reads={}
+
+    def local_names(self):
+        return self.params|self.assigned
+
+class ScopeAnalyzer:
+    def analyze(self,node):
+        self.module=Scope()
+        self.functions=[]
+        self.scope=self.module
+        self.visit(node)
+        return self
+
+    def global_names(self):
+        names=set(self.module.reads)
+        for scope in self.functions:
+            names|=set(scope.reads)-scope.local_names()
+        return names
+
+    def visit(self,node):
+        method_name=f'visit_{type(node).__name__}'
+        method=getattr(self,method_name,self.no_visit_method)
+        return method(node)
+
+    def no_visit_method(self,node):
+        raise TranspileError(f'No visit_{type(node).__name__} method defined')
+
+    def visit_NumberNode(self,node):
+        pass
+
+    def visit_StringNode(self,node):
+        pass
+
+    def visit_VarAccessNode(self,node):
+        self.scope.reads.setdefault(node.var_name_tok.value,node)
+
+    def visit_VarAssignNode(self,node):
+        self.visit(node.value_node)
+        self.scope.assigned.add(node.var_name_tok.value)
+
+    def visit_BinaryOpnode(self,node):
+        self.visit(node.left_node)
+        self.visit(node.right_node)
+
+    def visit_UnaryOpnode(self,node):
+        self.visit(node.node)
+
+    def visit_ListNode(self,node):
+        for element_node in node.element_nodes:
+            self.visit(element_node)
+
+    def visit_DictionaryNode(self,node):
+        raise TranspileError("Dictionaries are not supported")
+
+    def visit_IfNode(self,node):
+        for condition,expression,return_null in node.cases:
+            self.visit(condition)
+            self.visit(expression)
+        if node.else_case:
+            self.visit(node.else_case[0])
+
+    def visit_ForNode(self,node):
+        self.visit(node.start_value_node)
+        self.visit(node.end_value_node)
+        if node.step_value_node:
+            self.visit(node.step_value_node)
+        self.scope.assigned.add(node.var_name_tok.value)
+        self.visit(node.body_node)
+
+    def visit_WhileNode(self,node):
+        self.visit(node.condition_node)
+        self.visit(node.body_node)
+
+    def visit_CachedNode(self,node):
+        self.visit(node.node)
+
+    def visit_CacheScopeNode(self,node):
+        self.visit(node.node)
+
+    def visit_FuncDefNode(self,node):
+        if node.var_name_tok:
+            self.scope.assigned.add(node.var_name_tok.value)
+        outer=self.scope
+        self.scope=Scope(node,[arg_name.value for arg_name in node.arg_name_toks])
+        self.visit(node.body_node)
+        self.functions.append(self.scope)
+        self.scope=outer
+
+    def visit_CallNode(self,node):
+        self.visit(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.visit(arg_node)
+
+class AssignmentChecker:
+    def __init__(self,local_names=None):
+        self.local_names=local_names
+        self.unassigned=set()
+
+    def check(self,node):
+        self.visit(node,set())
+        return self.unassigned
+
+    def visit(self,node,assigned):
+        method_name=f'visit_{type(node).__name__}'
+        method=getattr(self,method_name,self.visit_children)
+        return method(node,assigned)
+
+    def visit_children(self,node,assigned):
+        return assigned
+
+    def visit_VarAccessNode(self,node,assigned):
+        var_name=node.var_name_tok.value
+        if var_name in assigned:
+            return assigned
+        if self.local_names is None:
+            self.unassigned.add(var_name)
+        elif var_name in self.local_names:
+            raise TranspileError(f"'{var_name}' may be read before it is assigned in a Method")
+        return assigned
+
+    def visit_VarAssignNode(self,node,assigned):
+        return self.visit(node.value_node,assigned)|{node.var_name_tok.value}
+
+    def visit_BinaryOpnode(self,node,assigned):
+        return self.visit(node.right_node,self.visit(node.left_node,assigned))
+
+    def visit_UnaryOpnode(self,node,assigned):
+        return self.visit(node.node,assigned)
+
+    def visit_ListNode(self,node,assigned):
+        for element_node in node.element_nodes:
+            assigned=self.visit(element_node,assigned)
+        return assigned
+
+    def visit_CallNode(self,node,assigned):
+        assigned=self.visit(node.node_to_call,assigned)
+        for arg_node in node.arg_nodes:
+            assigned=self.visit(arg_node,assigned)
+        return assigned
+
+    def visit_IfNode(self,node,assigned):
+        branches=[]
+        for condition,expression,return_null in node.cases:
+            assigned=self.visit(condition,assigned)
+            branches.append(self.visit(expression,assigned))
+        if node.else_case:
+            branches.append(self.visit(node.else_case[0],assigned))
+        else:
+            branches.append(assigned)
+        return set.intersection(*branches)
+
+    def visit_ForNode(self,node,assigned):
+        assigned=self.visit(node.start_value_node,assigned)
+        assigned=self.visit(node.end_value_node,assigned)
+        if node.step_value_node:
+            assigned=self.visit(node.step_value_node,assigned)
+        self.visit(node.body_node,assigned|{node.var_name_tok.value})
+        return assigned
+
+    def visit_WhileNode(self,node,assigned):
+        assigned=self.visit(node.condition_node,assigned)
+        self.visit(node.body_node,assigned)
+        return assigned
+
+    def visit_CachedNode(self,node,assigned):
+        return self.visit(node.node,assigned)
+
+    def visit_CacheScopeNode(self,node,assigned):
+        return self.visit(node.node,assigned)
+
+    def visit_FuncDefNode(self,node,assigned):
+        if node.var_name_tok:
+            assigned=assigned|{node.var_name_tok.value}
+        if self.local_names is None:
+            self.unassigned|=ScopeAnalyzer().analyze(node).global_names()-assigned
+        return assigned
+
+#Python Transpiler
+class PythonTranspiler:
+    def transpile(self,node,filename):
+        analysis=ScopeAnalyzer().analyze(node)
+        self.check_scopes(analysis)
+        self.filename=filename
+        self.lines=[]
+        self.indent=0
+        self.nodes=[]
+        self.temp_count=0
+        self.function_count=0
+        self.scope_name="<module>"
+        self.name_nodes={}
+
+        for statement in node.element_nodes:
+            value=self.expression(statement)
+            self.emit(f"_results.append({value})")
+
+        source="\n".join("    "*indent+line for indent,line in self.lines)+"\n"
+        code=compile(source,f"<transpiled {filename}>","exec")
+        return TranspiledProgram(code,source,node,self.nodes,self.name_nodes,AssignmentChecker().check(node),analysis.module.assigned)
+
+    def check_scopes(self,analysis):
+        function_locals=set()
+        for scope in analysis.functions:
+            function_locals|=scope.local_names()
+
+        for scope in analysis.functions:
+            if (set(scope.reads)-scope.local_names())&function_locals:
+                raise TranspileError("Method reads a name that is local to another Method")
+            AssignmentChecker(scope.assigned-scope.params).check(scope.node.body_node)
+
+    def emit(self,line):
+        self.lines.append((self.indent,line))
+
+    def temp(self):
+        self.temp_count+=1
+        return f"_t{self.temp_count}"
+
+    def node_index(self,node):
+        self.nodes.append(node)
+        return len(self.nodes)-1
+
+    def is_safe(self,value):
+        return re.fullmatch(r"_[tf]\d+",value) is not None or value[0] not in "v_["
+
+    def block(self,node,result=None,return_null=True):
+        mark=len(self.lines)
+        self.indent+=1
+        self.branch(node,result,return_null)
+        if len(self.lines)==mark:
+            self.emit("pass")
+        self.indent-=1
+
+    def branch(self,node,result,return_null):
+        if result is None:
+            self.statement(node)
+        elif return_null:
+            self.statement(node)
+            self.emit(f"{result}=0")
+        else:
+            value=self.expression(node)
+            self.emit(f"{result}={value}")
+
+    def operands(self,nodes):
+        values=[]
+        for node in nodes:
+            mark=len(self.lines)
+            value=self.expression(node)
+            if len(self.lines)>mark:
+                spills=[]
+                for i,previous in enumerate(values):
+                    if not self.is_safe(previous):
+                        temp=self.temp()
+                        spills.append((self.indent,f"{temp}={previous}"))
+                        values[i]=temp
+                self.lines[mark:mark]=spills
+            values.append(value)
+        return values
+
+    def statement(self,node):
+        if isinstance(node,ListNode):
+            for element_node in node.element_nodes:
+                self.statement(element_node)
+        elif isinstance(node,IfNode):
+            self.if_cases(node.cases,node.else_case,None)
+        elif isinstance(node,ForNode):
+            self.for_loop(node,None)
+        elif isinstance(node,WhileNode):
+            self.while_loop(node,None)
+        elif isinstance(node,VarAssignNode):
+            self.expression(node)
+        elif isinstance(node,CacheScopeNode):
+            self.statement(node.node)
+        else:
+            value=self.expression(node)
+            if not self.is_safe(value):
+                self.emit(value)
+
+    def expression(self,node):
+        method_name=f'visit_{type(node).__name__}'
+        method=getattr(self,method_name,self.no_visit_method)
+        return method(node)
+
+    def no_visit_method(self,node):
+        raise TranspileError(f'No visit_{type(node).__name__} method defined')
+
+    def visit_NumberNode(self,node):
+        return repr(node.tok.value)
+
+    def visit_StringNode(self,node):
+        return repr(node.tok.value)
+
+    def visit_VarAccessNode(self,node):
+        self.name_nodes.setdefault((self.scope_name,node.var_name_tok.value),node)
+        return f"v_{node.var_name_tok.value}"
+
+    def visit_VarAssignNode(self,node):
+        value=self.expression(node.value_node)
+        self.emit(f"v_{node.var_name_tok.value}={value}")
+        return f"v_{node.var_name_tok.value}"
+
+    def visit_BinaryOpnode(self,node):
+        method_name=node.method_name
+        if method_name in SHORT_CIRCUIT:
+            return self.short_circuit(node,method_name)
+        left,right=self.operands([node.left_node,node.right_node])
+        return f"_{method_name}({left},{right},{self.node_index(node)})"
+
+    def short_circuit(self,node,method_name):
+        left=self.expression(node.left_node)
+        result=self.temp()
+        self.emit(f"{result}={left}")
+        self.emit(f"if _decides({result},{SHORT_CIRCUIT[method_name]}):")
+        self.emit(f"    {result}=int({result})")
+        self.emit("else:")
+        self.indent+=1
+        right=self.expression(node.right_node)
+        self.emit(f"{result}=_{method_name}({result},{right},{self.node_index(node)})")
+        self.indent-=1
+        return result
+
+    def visit_UnaryOpnode(self,node):
+        value=self.expression(node.node)
+        if node.operator.type==T_MINUS:
+            return f"_negate({value},{self.node_index(node)})"
+        elif node.operator.matches(T_KEYWORD,"not"):
+            return f"_notop({value},{self.node_index(node)})"
+        return value
+
+    def visit_ListNode(self,node):
+        return "["+",".join(self.operands(node.element_nodes))+"]"
+
+    def visit_CachedNode(self,node):
+        return self.expression(node.node)
+
+    def visit_CacheScopeNode(self,node):
+        return self.expression(node.node)
+
+    def visit_IfNode(self,node):
+        result=self.temp()
+        self.if_cases(node.cases,node.else_case,result)
+        return result
+
+    def if_cases(self,cases,else_case,result):
+        condition,expression,return_null=cases[0]
+        value=self.expression(condition)
+        self.emit(f"if _is_true({value}):")
+        self.block(expression,result,return_null)
+
+        if len(cases)>1:
+            self.emit("else:")
+            self.indent+=1
+            self.if_cases(cases[1:],else_case,result)
+            self.indent-=1
+        elif else_case:
+            self.emit("else:")
+            self.block(else_case[0],result,else_case[1])
+        elif result is not None:
+            self.emit("else:")
+            self.indent+=1
+            self.emit(f"{result}=0")
+            self.indent-=1
+
+    def visit_ForNode(self,node):
+        result=self.temp()
+        self.for_loop(node,result)
+        return result
+
+    def for_loop(self,node,result):
+        bounds=[node.start_value_node,node.end_value_node]
+        if node.step_value_node:
+            bounds.append(node.step_value_node)
+        bounds=self.operands(bounds)
+        if len(bounds)==2:
+            bounds.append("1")
+        bounds.append(str(self.node_index(node)))
+
+        if result is not None and not node.return_null:
+            self.emit(f"{result}=[]")
+            self.emit(f"for v_{node.var_name_tok.value} in _range({','.join(bounds)}):")
+            self.indent+=1
+            value=self.expression(node.body_node)
+            self.emit(f"{result}.append({value})")
+            self.indent-=1
+        else:
+            self.emit(f"for v_{node.var_name_tok.value} in _range({','.join(bounds)}):")
+            self.block(node.body_node)
+            if result is not None:
+                self.emit(f"{result}=0")
+
+    def visit_WhileNode(self,node):
+        result=self.temp()
+        self.while_loop(node,result)
+        return result
+
+    def while_loop(self,node,result):
+        collect=result is not None and not node.return_null
+        if collect:
+            self.emit(f"{result}=[]")
+
+        loop=len(self.lines)
+        self.emit("while True:")
+        self.indent+=1
+        mark=len(self.lines)
+        condition=self.expression(node.condition_node)
+        if len(self.lines)==mark:
+            self.lines[loop]=(self.indent-1,f"while _is_true({condition}):")
+        else:
+            self.emit(f"if not _is_true({condition}):")
+            self.emit("    break")
+
+        if collect:
+            value=self.expression(node.body_node)
+            self.emit(f"{result}.append({value})")
+        else:
+            mark=len(self.lines)
+            self.statement(node.body_node)
+            if len(self.lines)==mark:
+                self.emit("pass")
+        self.indent-=1
+
+        if result is not None and not collect:
+            self.emit(f"{result}=0")
+
+    def visit_FuncDefNode(self,node):
+        self.function_count+=1
+        function=f"_f{self.function_count}"
+        arg_names=[f"v_{arg_name.value}" for arg_name in node.arg_name_toks]
+
+        outer=self.scope_name
+        self.scope_name=function
+        self.emit(f"def {function}({','.join(arg_names)}):")
+        self.indent+=1
+        if node.return_null:
+            self.statement(node.body_node)
+            self.emit("return 0")
+        else:
+            self.tail(node.body_node)
+        self.indent-=1
+        self.scope_name=outer
+
+        func_name=node.var_name_tok.value if node.var_name_tok else None
+        self.emit(f"{function}=_function({function},{func_name!r},{self.node_index(node)})")
+        if func_name:
+            self.emit(f"v_{func_name}={function}")
+        return function
+
+    def visit_CallNode(self,node):
+        values=self.operands([node.node_to_call]+node.arg_nodes)
+        return f"_call({self.node_index(node)},{','.join(values)})"
+
+    #Calls in tail position return a TailCall that the enclosing _call runs in its own loop
+    def tail(self,node):
+        if isinstance(node,CallNode):
+            values=self.operands([node.node_to_call]+node.arg_nodes)
+            self.emit(f"return _tail({self.node_index(node)},{','.join(values)})")
+        elif isinstance(node,IfNode):
+            self.tail_cases(node.cases,node.else_case)
+        else:
+            value=self.expression(node)
+            self.emit(f"return {value}")
+
+    def tail_cases(self,cases,else_case):
+        condition,expression,return_null=cases[0]
+        value=self.expression(condition)
+        self.emit(f"if _is_true({value}):")
+        self.tail_block(expression,return_null)
+
+        if len(cases)>1:
+            self.emit("else:")
+            self.indent+=1
+            self.tail_cases(cases[1:],else_case)
+            self.indent-=1
+        elif else_case:
+            self.emit("else:")
+            self.tail_block(*else_case)
+        else:
+            self.emit("return 0")
+
+    def tail_block(self,node,return_null):
+        self.indent+=1
+        if return_null:
+            self.statement(node)
+            self.emit("return 0")
+        else:
+            self.tail(node)
+        self.indent-=1
+
+#Transpiled Runtime
+class TranspiledCallable:
+    def __init__(self,function,name,arity,node=None):
+        self.function=function
+        self.name=name or "<anonymous>"
+        self.arity=arity
+        self.node=node
+
+    def __repr__(self):
+        if self.node is None:
+            return f"<built-in function{self.name}>"
+        return f"<function>{self.name}"
+
+class TranspiledRaise(Exception):
+    def __init__(self,details,index,kind):
+        super().__init__(details)
+        self.details=details
+        self.index=index
+        self.kind=kind
+        self.frames=[]
+        self.name_error=None
+
+class PythonRuntime:
+    depth=0
+    max_depth=MAX_CALL_DEPTH
+
+    @staticmethod
+    def is_number(value):
+        return type(value) is int or type(value) is float
+
+    @staticmethod
+    def is_true(value):
+        if type(value) is int or type(value) is float:
+            return value!=0
+        if type(value) is str:
+            return len(value)>0
+        return False
+
+    @staticmethod
+    def decides(value,outcome):
+        return (type(value) is int or type(value) is float) and (value!=0)==outcome
+
+    @staticmethod
+    def to_string(value):
+        if type(value) is str:
+            return value
+        if type(value) is list:
+            return ", ".join([PythonRuntime.to_string(x) for x in value])
+        return str(value) if PythonRuntime.is_number(value) else repr(value)
+
+    @staticmethod
+    def range(start,end,step,index):
+        if type(start) is int and type(end) is int and type(step) is int and step!=0:
+            return range(start,end+1 if step>0 else end-1,step)
+        for kind,value in (("start_value_node",start),("end_value_node",end),("step_value_node",step)):
+            if not PythonRuntime.is_number(value):
+                raise TranspiledRaise("Loop bounds must be numbers",index,kind)
+        if step==0:
+            raise TranspiledRaise("Step must not be zero",index,"step_value_node")
+        return stepped_values(start,end,step)
+
+    @staticmethod
+    def function(function,name,index):
+        return TranspiledCallable(function,name,function.__code__.co_argcount,index)
+
+    @staticmethod
+    def check_call(index,value,args):
+        if type(value) is not TranspiledCallable:
+            raise TranspiledRaise("Illegal Operation",index,"node")
+        if len(args)!=value.arity:
+            if len(args)>value.arity:
+                details=f"{len(args)-value.arity} excess arguments are passed into '{value}'"
+            else:
+                details=f"{value.arity-len(args)} less arguments are passed into '{value}'"
+            raise TranspiledRaise(details,index,"node")
+
+    @staticmethod
+    def call(index,value,*args):
+        if type(value) is not TranspiledCallable or len(args)!=value.arity:
+            PythonRuntime.check_call(index,value,args)
+        calls=None
+        try:
+            result=value.function(*args)
+            while type(result) is TailCall:
+                if calls is None:
+                    calls=[]
+                calls.append((value.name,index))
+                value,args,index=result.function,result.args,result.node
+                result=value.function(*args)
+            return result
+        except TranspiledRaise as exception:
+            exception.frames.append((value.name,index))
+            if calls:
+                exception.frames.extend(reversed(calls))
+            raise
+        except NameError as name_error:
+            exception=TranspiledRaise(None,None,"name")
+            exception.name_error=name_error
+            exception.frames.append((value.name,index))
+            if calls:
+                exception.frames.extend(reversed(calls))
+            raise exception from None
+        except RecursionError:
+            exception=TranspiledRaise("Maximum recursion depth exceeded",index,"node")
+            if calls:
+                exception.frames.extend(reversed(calls))
+            raise exception from None
+
+    #Used instead of call when max_depth is below the Python recursion limit, which is otherwise reached first
+    @staticmethod
+    def counted_call(index,value,*args):
+        if type(value) is not TranspiledCallable or len(args)!=value.arity:
+            PythonRuntime.check_call(index,value,args)
+        depth=PythonRuntime.depth
+        if depth>=PythonRuntime.max_depth and value.node is not None:
+            raise TranspiledRaise("Maximum recursion depth exceeded",index,"node")
+        PythonRuntime.depth=depth+1
+        try:
+            return PythonRuntime.call(index,value,*args)
+        finally:
+            PythonRuntime.depth=depth
+
+    @staticmethod
+    def tail(index,value,*args):
+        PythonRuntime.check_call(index,value,args)
+        if value.node is None:
+            return PythonRuntime.call(index,value,*args)
+        return TailCall(value,args,index)
+
+    @staticmethod
+    def add(left,right,index):
+        if PythonRuntime.is_number(left) and PythonRuntime.is_number(right):
+            return left+right
+        if type(left) is type(right) and (type(left) is str or type(left) is list):
+            return left+right
+        raise TranspiledRaise("Illegal Operation",index,"operation")
+
+    @staticmethod
+    def subtract(left,right,index):
+        if PythonRuntime.is_number(left) and PythonRuntime.is_number(right):
+            return left-right
+        if type(left) is list and PythonRuntime.is_number(right):
+            try:
+                left.pop(right)
+                return left
+            except:
+                raise TranspiledRaise('List index out of range',index,"right")
+        raise TranspiledRaise("Illegal Operation",index,"operation")
+
+    @staticmethod
+    def multiply(left,right,index):
+        if PythonRuntime.is_number(right) and (PythonRuntime.is_number(left) or type(left) is str or type(left) is list):
+            return left*right
+        raise TranspiledRaise("Illegal Operation",index,"operation")
+
+    @staticmethod
+    def divide(left,right,index):
+        if PythonRuntime.is_number(left) and PythonRuntime.is_number(right):
+            if right==0:
+                raise TranspiledRaise("Division By Zero",index,"right")
+            return left/right
+        raise TranspiledRaise("Illegal Operation",index,"operation")
+
+    @staticmethod
+    def floor_divide(left,right,index):
+        if PythonRuntime.is_number(left) and PythonRuntime.is_number(right):
+            if right==0:
+                raise TranspiledRaise("Division By Zero",index,"right")
+            return left//right
+        raise TranspiledRaise("Illegal Operation",index,"operation")
+
+    @staticmethod
+    def modulo(left,right,index):
+        if PythonRuntime.is_number(left) and PythonRuntime.is_number(right):
+            if right==0:
+                raise TranspiledRaise("Modulo By Zero",index,"right")
+            return left%right
+        raise TranspiledRaise("Illegal Operation",index,"operation")
+
+    @staticmethod
+    def power(left,right,index):
+        if PythonRuntime.is_number(left) and PythonRuntime.is_number(right):
+            return left**right
+        raise TranspiledRaise("Illegal Operation",index,"operation")
+
+    @staticmethod
+    def index(left,right,index):
+        if type(left) is str:
+            message='String index out of range'
+        elif type(left) is list:
+            message='List index out of range'
+        else:
+            raise TranspiledRaise("Illegal Operation",index,"operation")
+
+        if PythonRuntime.is_number(right):
+            positions=[right]
+        elif type(right) is list:
+            positions=right
+        else:
+            raise TranspiledRaise("Illegal Operation",index,"operation")
+
+        try:
+            elements=[]
+            for position in positions:
+                if position==0:
+                    raise IndexError
+                elif position>0:
+                    position-=1
+                elements.append(left[position])
+        except:
+            raise TranspiledRaise(message,index,"right")
+
+        if type(right) is list:
+            return "".join(elements) if type(left) is str else elements
+        return elements[0]
+
+    @staticmethod
+    def comparison(function):
+        def compare(left,right,index):
+            if PythonRuntime.is_number(left) and PythonRuntime.is_number(right):
+                return int(function(left,right))
+            raise TranspiledRaise("Illegal Operation",index,"operation")
+        return compare
+
+    @staticmethod
+    def negate(value,index):
+        if PythonRuntime.is_number(value) or type(value) is str or type(value) is list:
+            return value*-1
+        raise TranspiledRaise("Illegal Operation",index,"operand")
+
+    @staticmethod
+    def notop(value,index):
+        if PythonRuntime.is_number(value):
+            return 1 if value==0 else 0
+        raise TranspiledRaise("Illegal Operation",index,"operand")
+
+    @staticmethod
+    def builtin_print(value):
+        print(PythonRuntime.to_string(value))
+        return 0
+
+    @staticmethod
+    def builtin_input():
+        return input()
+
+    @staticmethod
+    def builtin_input_int():
+        while True:
+            text=input()
+            try:
+                return int(text)
+            except ValueError:
+                print(f"'{text}' must be an integer")
+
+    @staticmethod
+    def builtin_is_number(value):
+        return int(PythonRuntime.is_number(value))
+
+    @staticmethod
+    def builtin_is_string(value):
+        return int(type(value) is str)
+
+    @staticmethod
+    def builtin_is_list(value):
+        return int(type(value) is list)
+
+    @staticmethod
+    def builtin_append(list_,value):
+        if type(list_) is not list:
+            raise TranspiledRaise("First argument must be a list",None,"call")
+        list_.append(value)
+        return 0
+
+    @staticmethod
+    def builtin_pop(list_,index):
+        if type(list_) is not list:
+            raise TranspiledRaise("First argument must be a list",None,"call")
+        if not PythonRuntime.is_number(index):
+            raise TranspiledRaise("Second argument must be an integer",None,"call")
+        try:
+            return list_.pop(index-1 if index>0 else index)
+        except:
+            raise TranspiledRaise("List index out of range",None,"call")
+
+    @staticmethod
+    def builtin_extend(listA,listB):
+        if type(listA) is not list:
+            raise TranspiledRaise("First argument must be a list",None,"call")
+        if type(listB) is not list:
+            raise TranspiledRaise("Second argument must be a list",None,"call")
+        listA.extend(listB)
+        return 0
+
+PythonRuntime.builtins={
+    name:TranspiledCallable(getattr(PythonRuntime,f"builtin_{name}"),name,len(getattr(BuiltInFunction,f"execute_{name}").arg_names))
+    for name in ["print","input","input_int","is_number","is_string","is_list","append","pop","extend"]
+}
+
+PythonRuntime.namespace={
+    "_is_true":PythonRuntime.is_true,
+    "_decides":PythonRuntime.decides,
+    "_range":PythonRuntime.range,
+    "_function":PythonRuntime.function,
+    "_call":PythonRuntime.call,
+    "_tail":PythonRuntime.tail,
+    "_add":PythonRuntime.add,
+    "_subtract":PythonRuntime.subtract,
+    "_multiply":PythonRuntime.multiply,
+    "_divide":PythonRuntime.divide,
+    "_floor_divide":PythonRuntime.floor_divide,
+    "_modulo":PythonRuntime.modulo,
+    "_power":PythonRuntime.power,
+    "_index":PythonRuntime.index,
+    "_comparison_equal":PythonRuntime.comparison(operator.eq),
+    "_comparison_notequal":PythonRuntime.comparison(operator.ne),
+    "_comparison_lessthan":PythonRuntime.comparison(operator.lt),
+    "_comparison_lessthanequal":PythonRuntime.comparison(operator.le),
+    "_comparison_greaterthan":PythonRuntime.comparison(operator.gt),
+    "_comparison_greaterthanequal":PythonRuntime.comparison(operator.ge),
+    "_andop":PythonRuntime.comparison(lambda left,right:left and right),
+    "_orop":PythonRuntime.comparison(lambda left,right:left or right),
+    "_negate":PythonRuntime.negate,
+    "_notop":PythonRuntime.notop,
+}
+
+#Transpiled Program Class
+class TranspiledProgram:
+    def __init__(self,code,source,node,nodes,name_nodes,names,assigned):
+        self.code=code
+        self.source=source
+        self.node=node
+        self.nodes=nodes
+        self.name_nodes=name_nodes
+        self.names=names
+        self.assigned=assigned
+
+    def execute(self,context):
+        namespace=dict(PythonRuntime.namespace)
+        for name in self.names:
+            value=context.symbol_table.get(name)
+            if value is None:
+                continue
+            if isinstance(value,(Number,String)):
+                namespace[f"v_{name}"]=value.value
+            elif isinstance(value,BuiltInFunction) and value.name in PythonRuntime.builtins:
+                namespace[f"v_{name}"]=PythonRuntime.builtins[value.name]
+            else:
+                return None
+        results=namespace["_results"]=[]
+        if context.max_depth<sys.getrecursionlimit():
+            namespace["_call"]=PythonRuntime.counted_call
+            PythonRuntime.depth=context.depth
+            PythonRuntime.max_depth=context.max_depth
+
+        res=RunTimeResult()
+        try:
+            exec(self.code,namespace)
+        except TranspiledRaise as exception:
+            res.failure(self.runtime_error(exception,context))
+        except RecursionError:
+            res.failure(recursion_error(self.node.start,self.node.end,context))
+        except NameError as name_error:
+            exception=TranspiledRaise(None,None,"name")
+            exception.name_error=name_error
+            res.failure(self.runtime_error(exception,context))
+        finally:
+            for name in self.assigned:
+                if f"v_{name}" in namespace:
+                    context.symbol_table.set(name,self.to_value(namespace[f"v_{name}"],context))
 
-        return_value=res.register(value_to_call.execute(args))
         if res.error:
             return res
-        return_value=return_value.copy().set_pos(node.start,node.end).set_context(context)
-        return res.success(return_value)
+        elements=[self.to_value(value,context) for value in results]
+        return res.success(List(elements).set_context(context).set_pos(self.node.start,self.node.end))
+
+    def to_value(self,value,context,converted=None):
+        if converted is None:
+            converted={}
+        if type(value) is int or type(value) is float:
+            return Number(value).set_context(context)
+        if type(value) is str:
+            return String(value).set_context(context)
+        if type(value) is list:
+            if id(value) not in converted:
+                converted[id(value)]=List([])
+                converted[id(value)].elements.extend([self.to_value(element,context,converted) for element in value])
+            return converted[id(value)].set_context(context)
+        if value.node is None:
+            return getattr(BuiltInFunction,value.name)
+        node=self.nodes[value.node]
+        return Function(value.name if node.var_name_tok else None,node.body_node,
+        [arg_name.value for arg_name in node.arg_name_toks],node.return_null,node.layout).set_context(context).set_pos(node.start,node.end)
+
+    def runtime_error(self,exception,context):
+        for name,index in reversed(exception.frames):
+            context=Context(name,context,self.nodes[index].start)
+
+        if exception.kind=="name":
+            node,details=self.name_node(exception.name_error)
+            start,end=node.start,node.end
+        elif exception.kind=="call":
+            node=self.nodes[exception.frames[0][1]]
+            start,end,details=node.start,node.end,exception.details
+        else:
+            node=self.nodes[exception.index]
+            details=exception.details
+            if exception.kind=="node":
+                start,end=node.start,node.end
+            elif exception.kind=="operand":
+                start,end=value_position(node.node)
+            elif exception.kind=="right":
+                start,end=value_position(node.right_node)
+            elif exception.kind in LOOP_BOUNDS:
+                start,end=value_position(getattr(node,exception.kind))
+            else:
+                start=value_position(node.left_node)[0]
+                end=value_position(node.right_node)[1]
+        return RunTimeError(start,end,details,context)
+
+    def name_node(self,name_error):
+        traceback=name_error.__traceback__
+        scope_name=None
+        while traceback:
+            if traceback.tb_frame.f_code.co_filename==self.code.co_filename:
+                scope_name=traceback.tb_frame.f_code.co_name
+            traceback=traceback.tb_next
+        match=re.search(r"'v_(\w+)'",str(name_error))
+        if not match or (scope_name,match.group(1)) not in self.name_nodes:
+            raise name_error
+        var_name=match.group(1)
+        return self.name_nodes[(scope_name,var_name)],f"'{var_name}' is not defined"
+
+transpiled_programs=LRUCache(128)
+
+def transpile(key,node):
+    filename=key[0]
+    try:
+        program=PythonTranspiler().transpile(node,filename)
+    except (TranspileError,SyntaxError,RecursionError):
+        program=None
+    transpiled_programs.set(key,program)
+    return program
 
 global_symbol_table=SymbolTable()
 global_symbol_table.set("Null",Number.null)
 global_symbol_table.set("True",Number.true)
 global_symbol_table.set("False",Number.false)
-global_symbol_table.set("Print",BuiltInFunction.print)
-global_symbol_table.set("Input",BuiltInFunction.input)
-global_symbol_table.set("Input_Int",BuiltInFunction.input_int)
-global_symbol_table.set("Is_number",BuiltInFunction.is_number)
-global_symbol_table.set("Is_string",BuiltInFunction.is_string)
-global_symbol_table.set("Is_list",BuiltInFunction.is_list)
-global_symbol_table.set("Append",BuiltInFunction.append)
-global_symbol_table.set("Pop",BuiltInFunction.pop)
-global_symbol_table.set("Extend",BuiltInFunction.extend)
+for global_name,name in builtin_functions.items():
+    global_symbol_table.set(global_name,getattr(BuiltInFunction,name))
 
 
 #Run Method
-def run(filename,text):
-    #Generate Tokens
-    lexer=Lexer(filename,text)
-    tokens,error=lexer.create_tokens()
+def run(filename,text,engine="interpreter",artifact=None,max_depth=MAX_CALL_DEPTH):
+    context=Context("<program>")
+    context.symbol_table=global_symbol_table
+    context.max_depth=max_depth
 
-    if error:
-        return None,error
+    key=source_key(filename,text)
 
-    #Generate Abstract Syntax Tree
-    parser=Parser(tokens)
-    ast=parser.parse()
+    if engine=="python":
+        program=transpiled_programs.get(key)
+        result=program.execute(context) if program else None
+        if result:
+            return result.value,result.error
 
-    if ast.error:
-        return None,ast.error
+    node,error=generate_ast(filename,text,key,artifact)
 
-    interpreter=Interpreter()
-    context=Context("<program>")
-    context.symbol_table=global_symbol_table
-    result=interpreter.visit(ast.node,context)
+    if error:
+        return None,error
+
+    if engine=="interpreter":
+        result=Interpreter().execute(node,context)
+    elif engine=="vm":
+        code=Compiler().compile(node)
+        result=VirtualMachine().run(code,context)
+    elif engine=="closure":
+        program=ClosureCompiler().compile(node)
+        result=RunTimeResult()
+        try:
+            result.success(program(context))
+        except RunTimeException as exception:
+            result.failure(exception.error)
+        except RecursionError:
+            result.failure(recursion_error(node.start,node.end,context))
+    elif engine=="python":
+        if key in transpiled_programs:
+            program=None
+        else:
+            program=transpile(key,node)
+        result=program.execute(context) if program else None
+        if not result:
+            result=Interpreter().execute(node,context)
+    else:
+        raise Exception(f"Unknown engine '{engine}'")
 
     return result.value,result.error
 
+def run_file(filename,engine="interpreter",artifact=None,max_depth=MAX_CALL_DEPTH):
+    with open(filename,"rb") as file:
+        try:
+            text=mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ)
+        except ValueError:
+            return run(filename,"",engine,artifact,max_depth)
+    with text:
+        return run(filename,text,engine,artifact,max_depth)
+
 '''try:
     with open("MyProgram.txt","r") as file:
         script=file.read()
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import language
+
+ENGINES=("interpreter","vm","closure","python")
+
+def save_globals():
+    table=language.global_symbol_table
+    return dict(table.layout),list(table.slots),set(language.frame_names)
+
+def restore_globals(state):
+    layout,slots,frame_names=state
+    table=language.global_symbol_table
+    table.layout.clear()
+    table.layout.update(layout)
+    table.slots[:]=slots
+    language.frame_names.clear()
+    language.frame_names.update(frame_names)
+    language.parsed_programs.clear()
+    language.transpiled_programs.clear()
+
+#Runs a program from a clean global state and returns what it printed, plus the error's location or the result
+def observe(text,engine,capsys):
+    state=save_globals()
+    result,error=language.run("<test>",text,engine)
+    output=capsys.readouterr().out
+    restore_globals(state)
+    if error:
+        return output,(error.details,error.start.line,error.start.col,error.end.line,error.end.col,error.show_error())
+    return output,repr(result)
+
+#Yields every node reachable from node through the slots of the node classes, each once
+def ast_nodes(node,seen=None):
+    if seen is None:
+        seen=set()
+    if not hasattr(node,"__slots__") or isinstance(node,(language.Token,language.Position)) or id(node) in seen:
+        return
+    seen.add(id(node))
+    yield node
+    for name in type(node).__slots__:
+        value=getattr(node,name,None)
+        for child in value if isinstance(value,(list,tuple)) else [value]:
+            for item in child if isinstance(child,tuple) else [child]:
+                yield from ast_nodes(item,seen)
+
+#Programs share the global symbol table and the AST caches, so every test starts from the same state
+@pytest.fixture(autouse=True)
+def fresh_globals():
+    state=save_globals()
+    yield
+    restore_globals(state)
@@ -0,0 +1,40 @@
+import pytest
+
+from conftest import ENGINES
+from language import artifact_current,load_artifact,parsed_programs,run,source_key
+
+PROGRAM='''Method scale(xs,k) {StartCycle i=1:3 {xs?i*k*(k+1)}
+scale([1,2,3],4)
+'''
+
+def values(result):
+    return [element.value for element in result.elements[-1].elements]
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_artifact_round_trip(tmp_path,engine):
+    path=str(tmp_path/"program.clpa")
+    expected=values(run("<artifact>",PROGRAM,engine,path)[0])
+    assert artifact_current(path,source_key("<artifact>",PROGRAM))
+    parsed_programs.clear()
+    assert values(run("<artifact>",PROGRAM,engine,path)[0])==expected==[20,40,60]
+
+def test_artifact_written_for_cached_program(tmp_path):
+    path=str(tmp_path/"program.clpa")
+    run("<artifact>",PROGRAM)
+    run("<artifact>",PROGRAM,artifact=path)
+    assert load_artifact(path,"<artifact>",PROGRAM) is not None
+
+def test_stale_artifact_replaced_for_cached_program(tmp_path):
+    path=str(tmp_path/"program.clpa")
+    run("<artifact>","Print(1)",artifact=path)
+    run("<artifact>",PROGRAM)
+    run("<artifact>",PROGRAM,artifact=path)
+    assert artifact_current(path,source_key("<artifact>",PROGRAM))
+    parsed_programs.clear()
+    assert values(run("<artifact>",PROGRAM,artifact=path)[0])==[20,40,60]
+
+def test_syntax_error_writes_no_artifact(tmp_path):
+    path=tmp_path/"program.clpa"
+    run("<artifact>","take = 1")
+    run("<artifact>","take = 1",artifact=str(path))
+    assert not path.exists()
@@ -0,0 +1,25 @@
+import pytest
+
+from conftest import ENGINES
+from language import parsed_programs,run
+
+def test_cache_hit_skips_front_end():
+    run("<cache>","Print(1)")
+    hits=parsed_programs.hits
+    run("<cache>","Print(1)")
+    assert parsed_programs.hits==hits+1
+
+def test_cache_keeps_syntax_errors():
+    first=run("<cache>","take = 1")[1]
+    second=run("<cache>","take = 1")[1]
+    assert second is first
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_shared_ast_sees_new_operand_types(engine):
+    run("<cache>","take a=1;take b=2",engine)
+    assert run("<cache>","a+b",engine)[0].elements[0].value==3
+    run("<cache>",'take a="x";take b="y"',engine)
+    assert run("<cache>","a+b",engine)[0].elements[0].value=="xy"
+    run("<cache>","take a=[1];take b=2",engine)
+    error=run("<cache>","a+b",engine)[1]
+    assert error.details=="Illegal Operation"
@@ -0,0 +1,71 @@
+import pytest
+
+from conftest import ENGINES,ast_nodes,observe
+from language import CachedNode,ExpressionCacher,generate_ast
+
+REASSIGNED_OPERANDS='''take a=1
+take t=0
+StartCycle i=1:5 {
+take t=t+a*2+a*2
+take a=a+1
+}
+Print(t)
+'''
+
+LATE_DIVISION_BY_ZERO='''take z=0
+take n=10
+StartCycle i=1:5 {
+Print(i)
+whether i==3 {Print(n/z)}
+}
+'''
+
+REBOUND_BUILTIN='''StartCycle j=1:2 {
+StartCycle i=1:2 {Print(Is_number(5)*Is_number(5))
+take Is_number=Method (x) {7}
+}
+'''
+
+SHADOWED_BUILTIN='''Method g() {StartCycle i=1:2 {Print(Is_number(5)*Is_number(5))}
+Method h(Is_number) {g()}
+g()
+h(Method (x) {3})
+'''
+
+SIDE_EFFECT_CALL='''take log=[]
+take k=4
+Method f(x) {[Append(log,x),x*2]}
+take t=0
+StartCycle i=1:3 {
+take t=t+(f(3)?2)*(k*k)+(f(3)?2)*(k*k)
+}
+Print(t)
+Print(log)
+'''
+
+PROGRAMS=[REASSIGNED_OPERANDS,LATE_DIVISION_BY_ZERO,REBOUND_BUILTIN,SHADOWED_BUILTIN,SIDE_EFFECT_CALL]
+
+def count_cached(tree):
+    return sum(type(node) is CachedNode for node in ast_nodes(tree))
+
+@pytest.mark.parametrize("text",PROGRAMS)
+def test_programs_are_cached(text):
+    assert count_cached(generate_ast("<cache>",text)[0])>0
+
+@pytest.mark.parametrize("engine",ENGINES)
+@pytest.mark.parametrize("text",PROGRAMS)
+def test_caching_keeps_behavior(text,engine,capsys,monkeypatch):
+    cached=observe(text,engine,capsys)
+    monkeypatch.setattr(ExpressionCacher,"optimize",lambda self,node:node)
+    assert count_cached(generate_ast("<uncached>",text)[0])==0
+    assert observe(text,engine,capsys)==cached
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_expected_results(engine,capsys):
+    assert observe(REASSIGNED_OPERANDS,engine,capsys)[0]=="60\n"
+    output,error=observe(LATE_DIVISION_BY_ZERO,engine,capsys)
+    assert output=="1\n2\n3\n"
+    assert error[:3]==("Division By Zero",4,22)
+    assert observe(REBOUND_BUILTIN,engine,capsys)[0]=="1\n1\n49\n49\n"
+    assert observe(SHADOWED_BUILTIN,engine,capsys)[0]=="1\n1\n9\n9\n"
+    assert observe(SIDE_EFFECT_CALL,engine,capsys)[0]=="576\n3, 3, 3, 3, 3, 3\n"
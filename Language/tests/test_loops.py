@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import ENGINES
+from language import run
+
+def loop(start,end,step,engine):
+    result,error=run("<loops>",f"StartCycle i={start}:{end}:{step} {{i",engine)
+    assert error is None
+    return [element.value for element in result.elements[0].elements]
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_float_step_values_come_from_index(engine):
+    assert loop(0,1,0.1,engine)==[0]+[index*0.1 for index in range(1,11)]
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_float_step_keeps_endpoint(engine):
+    assert len(loop(0,0.6,0.1,engine))==7
+    assert len(loop(0,1.2,0.1,engine))==13
+    assert len(loop(0,1.5,0.1,engine))==16
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_negative_float_step(engine):
+    assert loop(1,0,"-0.25",engine)==[1,0.75,0.5,0.25,0.0]
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_int_start_float_step(engine):
+    values=loop(1,2,0.5,engine)
+    assert values==[1,1.5,2.0]
+    assert type(values[0]) is int
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_empty_float_range(engine):
+    assert loop(1,0,0.5,engine)==[]
+
+@pytest.mark.parametrize("engine",ENGINES)
+@pytest.mark.parametrize("program,bound,details",[
+    ("StartCycle i=1:3:0 {i","0","Step must not be zero"),
+    ("take z=0.0\nStartCycle i=1:3:z {i","z","Step must not be zero"),
+    ('StartCycle i="a":3 {i','"a"',"Loop bounds must be numbers"),
+    ('Method f() {StartCycle i=1:Print:2 {i}\nf()',"Print","Loop bounds must be numbers"),
+])
+def test_invalid_bounds_are_located_errors(program,bound,details,engine):
+    result,error=run("<loops>",program,engine)
+    assert result is None
+    assert error.details==details
+    assert program[error.start.index:error.end.index]==bound
@@ -0,0 +1,35 @@
+import pytest
+
+from conftest import ENGINES
+from language import run
+
+def values(text,engine):
+    result,error=run("<operators>",text,engine)
+    assert error is None
+    return [element.value for element in result.elements]
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_right_operand_skipped(engine,capsys):
+    assert values('0 and Print("and")\n1 or Print("or")',engine)==[0,1]
+    assert capsys.readouterr().out==""
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_right_operand_evaluated_when_needed(engine,capsys):
+    assert values('1 and Print("and")\n0 or Print("or")',engine)==[0,0]
+    assert capsys.readouterr().out=="and\nor\n"
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_skipped_operand_side_effects(engine):
+    text='''take calls=[]
+Method bump(i) {Append(calls,i)}
+StartCycle i=1:5 {i<3 and bump(i)
+calls
+'''
+    result,error=run("<operators>",text,engine)
+    assert [element.value for element in result.elements[-1].elements]==[1,2]
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_skipped_operand_errors(engine):
+    assert values("0 and 1/0\n3 or undefined_name",engine)==[0,3]
+    error=run("<operators>","1 and 1/0",engine)[1]
+    assert error.details=="Division By Zero"
@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import ast_nodes,observe
+from language import BinaryOpnode,generate_ast,run
+
+CHANGING_ADD='''Method add(a,b) {a+b}
+Print(add(1,2))
+Print(add(1.5,2))
+Print(add(2,0.5))
+Print(add("a","b"))
+Print(add(3,4))
+Print(add(6,"x"))
+'''
+
+CHANGING_DIVIDE='''Method div(a,b) {a/b}
+Print(div(6,3))
+Print(div(1.5,0.5))
+Print(div(1,0))
+'''
+
+CHANGING_LOOP='''take x=1
+StartCycle i=1:4 {
+whether i==3 {take x="s"}
+Print(x*2<5)
+}
+'''
+
+INTEGER_ADD='''Method add(a,b) {a+b}
+add(1,2)
+'''
+
+PROGRAMS=[CHANGING_ADD,CHANGING_DIVIDE,CHANGING_LOOP]
+
+@pytest.mark.parametrize("text",PROGRAMS)
+def test_deoptimized_nodes_match_vm(text,capsys):
+    assert observe(text,"interpreter",capsys)==observe(text,"vm",capsys)
+
+def test_expected_results(capsys):
+    output,error=observe(CHANGING_ADD,"interpreter",capsys)
+    assert output=="3\n3.5\n2.5\nab\n7\n"
+    assert error[:3]==("Illegal Operation",0,17)
+    output,error=observe(CHANGING_DIVIDE,"interpreter",capsys)
+    assert output=="2.0\n3.0\n"
+    assert error[:3]==("Division By Zero",0,19)
+    output,error=observe(CHANGING_LOOP,"interpreter",capsys)
+    assert output=="1\n1\n"
+    assert error[:3]==("Illegal Operation",3,6)
+
+def quickened_node(text):
+    return next(node for node in ast_nodes(generate_ast("<quick>",text)[0]) if type(node) is BinaryOpnode)
+
+def test_mismatch_drops_fast_path(capsys):
+    assert quickened_node(INTEGER_ADD).quick is None
+    run("<quick>",INTEGER_ADD)
+    assert quickened_node(INTEGER_ADD).quick
+    run("<quick>",CHANGING_ADD)
+    assert quickened_node(CHANGING_ADD).quick is False
+
+@pytest.mark.parametrize("first,then",[("1,2","1.5,2"),("1.5,2","1,2"),("2,0.5","3,4")])
+def test_mixed_numbers_keep_fast_path(first,then,capsys):
+    program=f"Method add(a,b) {{a+b}}\nPrint(add({first}))\nPrint(add({then}))\n"
+    run("<quick>",program)
+    assert quickened_node(program).quick
+    assert capsys.readouterr().out==observe(program,"vm",capsys)[0]
@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import ENGINES
+from language import run
+
+TAIL_LOOP='''Method loop(n,acc) {whether n==0 {acc ifnot {loop(n-1,acc+1)}}}
+loop(100000,0)
+'''
+
+@pytest.mark.parametrize("engine",["interpreter","closure","python"])
+def test_tail_calls_run_in_constant_stack(engine):
+    result,error=run("<recursion>",TAIL_LOOP,engine)
+    assert error is None
+    assert result.elements[-1].value==100000
+
+@pytest.mark.parametrize("program",[
+    "Method a(n) {whether n==0 {1/0 ifnot {b(n-1)}}}\nMethod b(n) {a(n)}\na(3)",
+    "Method a(n) {whether n==0 {b(1,2) ifnot {a(n-1)}}}\nMethod b(n) {n}\na(2)",
+    "Method a(n) {whether n==0 {q ifnot {a(n-1)}}}\na(2)",
+    "Method a(n) {whether n==0 {n(1) ifnot {a(n-1)}}}\na(2)",
+    "Method a(n) {whether n==0 {Append(n,1) ifnot {a(n-1)}}}\na(2)",
+])
+def test_tail_call_tracebacks_match(program):
+    errors=[run("<recursion>",program,engine)[1] for engine in ENGINES]
+    assert len({error.show_error() for error in errors})==1
+    assert len({(error.start.index,error.end.index) for error in errors})==1
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_tail_position_in_branches(engine):
+    program="Method a(n) {whether n>1 {a(n-1) further n==1 {7}}}\n[a(3),a(0)]"
+    result,error=run("<recursion>",program,engine)
+    assert error is None
+    assert [element.value for element in result.elements[-1].elements]==[7,0]
+
+DEEP='''Method d(n) {whether n==0 {0 ifnot {d(n-1)+1}}}
+d(%d)
+'''
+
+def test_deep_recursion_runs_on_vm_heap_frames():
+    result,error=run("<recursion>",DEEP%3000,"vm")
+    assert error is None
+    assert result.elements[-1].value==3000
+
+@pytest.mark.parametrize("engine",["interpreter","closure","python"])
+def test_deep_recursion_is_a_located_error(engine):
+    result,error=run("<recursion>",DEEP%3000,engine)
+    assert result is None
+    assert error.details=="Maximum recursion depth exceeded"
+    assert DEEP[error.start.index:error.end.index+1]=="d(n-1)"
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_max_depth_allows_calls_up_to_the_limit(engine):
+    result,error=run("<recursion>",DEEP%49,engine,max_depth=50)
+    assert error is None
+    assert result.elements[-1].value==49
+
+def test_max_depth_error_matches_on_every_engine():
+    errors=[run("<recursion>",DEEP%100,engine,max_depth=50)[1] for engine in ENGINES]
+    assert {error.details for error in errors}=={"Maximum recursion depth exceeded"}
+    assert len({error.show_error() for error in errors})==1
+    assert len({(error.start.index,error.end.index) for error in errors})==1
+    assert errors[0].show_error().count("ind\n")==50
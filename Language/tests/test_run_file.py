@@ -0,0 +1,37 @@
+import mmap
+
+import pytest
+
+from conftest import ENGINES
+from language import run,run_file
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_run_file_result(tmp_path,engine):
+    path=tmp_path/"program.txt"
+    path.write_bytes(b'take a=2\ntake b="x"*a\nb+"y"\n')
+    result,error=run_file(str(path),engine)
+    assert error is None
+    assert result.elements[-1].value=="xxy"
+
+def test_run_file_empty(tmp_path):
+    path=tmp_path/"empty.txt"
+    path.write_bytes(b"")
+    error=run_file(str(path))[1]
+    assert error.details==run("<empty>","")[1].details
+
+@pytest.mark.parametrize("engine",ENGINES)
+def test_run_file_error_survives_file_change(tmp_path,engine):
+    path=tmp_path/"program.txt"
+    path.write_bytes(b"take a=1\ntake b=a/0\n")
+    result,error=run_file(str(path),engine)
+    assert error.details=="Division By Zero"
+    path.write_bytes(b"\n\n\n\n\n\ntake a=1\n")
+    assert (error.start.line,error.start.col)==(1,9)
+    assert not isinstance(error.start.source.text,mmap.mmap)
+
+def test_run_file_cached_ast_keeps_positions(tmp_path):
+    path=tmp_path/"program.txt"
+    path.write_bytes(b"take a=1\ntake b=a/0\n")
+    first=run_file(str(path))[1]
+    second=run_file(str(path))[1]
+    assert (second.start.line,second.start.col)==(first.start.line,first.start.col)==(1,9)